@@ -1,3 +1,6 @@
+from array import array
+import numpy as np
+
 # ----------------------------
 # Store Configuration Parameters
 # ----------------------------
@@ -11,13 +14,17 @@ class Store:
     def __init__(self):
         self.inventory = INITIAL_INVENTORY
         self.order_history = []
-        self.demand_history = []
+        self.demand_history = array("l")  # Compact typed buffer of daily demand
         self.supplier_history = []
         self.stockouts = 0
         self.total_holding_costs = 0
         self.total_stockout_costs = 0
         self.total_revenue = 0
 
+    @property
+    def orders_received(self):
+        return len(self.order_history)
+
     def receive_order(self, quantity, supplier_name):
         """Increase inventory when an order arrives"""
         self.inventory = min(self.inventory + quantity, MAX_STORAGE_CAPACITY)
@@ -36,6 +43,23 @@ class Store:
         self.calculate_stockout_costs(demand, fulfilled)
 
         return fulfilled
+
+    def fulfill_demand_series(self, demands):
+        """Fulfill several consecutive days of demand with no orders arriving in between"""
+        total_demand = int(np.sum(demands))
+        fulfilled = min(self.inventory, total_demand)
+        self.inventory -= fulfilled
+        self.record_demand_series(demands)
+        if fulfilled < total_demand:
+            self.stockouts += (total_demand - fulfilled)
+
+        self.calculate_revenue(fulfilled)
+        self.calculate_stockout_costs(total_demand, fulfilled)
+
+        return fulfilled
+
+    def record_demand_series(self, demands):
+        self.demand_history.extend(np.asarray(demands).tolist())
     
 
     #Calculate daily holding costs based on current inventory
@@ -58,3 +82,104 @@ class Store:
         revenue = fulfilled_units * SELLING_PRICE_PER_UNIT
         self.total_revenue += revenue
         return revenue
+
+
+# Supplier name <-> integer code registry shared by every CompactStore. It lives as long
+# as the process, so long-lived workers keep adding to it; codes are stored as this dtype.
+SUPPLIER_CODE_DTYPE = np.uint16
+SUPPLIER_CODES = {}
+SUPPLIER_NAMES = []
+
+def supplier_code(supplier_name):
+    """Returns the small integer code of a supplier name, registering it on first use."""
+    code = SUPPLIER_CODES.get(supplier_name)
+    if code is None:
+        code = len(SUPPLIER_NAMES)
+        if code > np.iinfo(SUPPLIER_CODE_DTYPE).max:
+            raise ValueError(f"Cannot register supplier {supplier_name!r}: CompactStore supports at most "
+                             f"{code} distinct supplier names per process")
+        SUPPLIER_CODES[supplier_name] = code
+        SUPPLIER_NAMES.append(supplier_name)
+    return code
+
+
+class CompactStore:
+    """
+    Memory-lean Store for runs holding many stores at once. It has no per-instance
+    __dict__, keeps history in typed NumPy arrays preallocated from the horizon and
+    records suppliers as integer codes. With keep_history=False no history is kept
+    at all and only the running totals are tracked.
+
+    The order_history, demand_history and supplier_history accessors return the
+    same values as Store's lists (as arrays for the numeric histories).
+    """
+    __slots__ = ("inventory", "stockouts", "total_holding_costs", "total_stockout_costs", "total_revenue",
+                 "orders_received", "days_recorded", "keep_history", "_orders", "_demands", "_suppliers")
+
+    def __init__(self, horizon=100, keep_history=True):
+        self.inventory = INITIAL_INVENTORY
+        self.stockouts = 0
+        self.total_holding_costs = 0
+        self.total_stockout_costs = 0
+        self.total_revenue = 0
+        self.orders_received = 0
+        self.days_recorded = 0
+        self.keep_history = keep_history
+        size = horizon if keep_history else 0
+        self._orders = np.zeros(size, dtype=np.int32)
+        self._demands = np.zeros(size, dtype=np.int32)
+        self._suppliers = np.zeros(size, dtype=SUPPLIER_CODE_DTYPE)
+
+    @property
+    def order_history(self):
+        return self._orders[:self.orders_received] if self.keep_history else self._orders
+
+    @property
+    def demand_history(self):
+        return self._demands[:self.days_recorded] if self.keep_history else self._demands
+
+    @property
+    def supplier_history(self):
+        codes = self._suppliers[:self.orders_received] if self.keep_history else self._suppliers
+        return [SUPPLIER_NAMES[code] for code in codes]
+
+    def receive_order(self, quantity, supplier_name):
+        """Increase inventory when an order arrives"""
+        self.inventory = min(self.inventory + quantity, MAX_STORAGE_CAPACITY)
+        if self.keep_history:
+            if self.orders_received == len(self._orders):
+                self._orders = np.resize(self._orders, max(2 * len(self._orders), 1))
+                self._suppliers = np.resize(self._suppliers, len(self._orders))
+            self._orders[self.orders_received] = quantity
+            self._suppliers[self.orders_received] = supplier_code(supplier_name)
+        self.orders_received += 1
+
+    def fulfill_demand(self, demand):
+        """Fulfill demand while tracking stockouts and revenue"""
+        fulfilled = min(self.inventory, demand)
+        self.inventory -= fulfilled
+        if self.keep_history:
+            if self.days_recorded == len(self._demands):
+                self._demands = np.resize(self._demands, max(2 * len(self._demands), 1))
+            self._demands[self.days_recorded] = demand
+        self.days_recorded += 1
+        if fulfilled < demand:
+            self.stockouts += (demand - fulfilled)
+
+        self.calculate_revenue(fulfilled)
+        self.calculate_stockout_costs(demand, fulfilled)
+
+        return fulfilled
+
+    def record_demand_series(self, demands):
+        if self.keep_history:
+            end = self.days_recorded + len(demands)
+            if end > len(self._demands):
+                self._demands = np.resize(self._demands, max(2 * len(self._demands), end))
+            self._demands[self.days_recorded:end] = demands
+        self.days_recorded += len(demands)
+
+    fulfill_demand_series = Store.fulfill_demand_series
+    calculate_holding_costs = Store.calculate_holding_costs
+    calculate_stockout_costs = Store.calculate_stockout_costs
+    calculate_revenue = Store.calculate_revenue
@@ -0,0 +1,100 @@
+"""
+Checks the import time of the core modules against bench/import_budget.json.
+
+Each module is imported in a fresh interpreter with `python -X importtime`. Its
+cumulative import time (best of several runs) must stay within its budget, and
+none of the forbidden heavy packages (e.g. scikit-learn, pandas) may be imported
+as a side effect:
+
+    python bench/check_import_time.py
+    python bench/check_import_time.py --update   # rewrite budgets from this machine
+
+The exit status is 1 if any module is over budget or imports a forbidden package.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+REPEATS = 5
+BUDGET_HEADROOM = 2.0  # --update sets each budget to this multiple of the measured time
+
+
+def import_profile(module, scratch):
+    """Returns {imported module: cumulative microseconds} for one fresh `import module`."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=scratch, env=env,
+                               check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    profile = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def measure(module, repeats=REPEATS):
+    """Best-of-repeats cumulative import time of module in ms, and every module it pulled in."""
+    timings = []
+    imported = set()
+    with tempfile.TemporaryDirectory() as scratch:
+        for _ in range(repeats):
+            profile = import_profile(module, scratch)
+            timings.append(profile[module] / 1000)
+            imported.update(profile)
+    return min(timings), imported
+
+
+def check(budget):
+    failures = []
+    measured = {}
+    forbidden = set(budget.get("forbidden_modules", []))
+    for module, limit in budget["budget_ms"].items():
+        milliseconds, imported = measure(module)
+        measured[module] = milliseconds
+        heavy = sorted({name.split(".")[0] for name in imported} & forbidden)
+        status = "ok"
+        if milliseconds > limit:
+            status = "OVER BUDGET"
+            failures.append(f"{module}: {milliseconds:.1f} ms > {limit} ms")
+        if heavy:
+            status = "FORBIDDEN IMPORT"
+            failures.append(f"{module}: imports {', '.join(heavy)}")
+        print(f"{module:<28} {milliseconds:>8.1f} ms / {limit:>5} ms  {status}", flush=True)
+    return measured, failures
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Checks module import times against a budget.")
+    parser.add_argument("--budget", default=BUDGET_FILE, help="budget JSON file")
+    parser.add_argument("--update", action="store_true",
+                        help="rewrite the budgets as the measured times times the headroom factor")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with open(args.budget) as file:
+        budget = json.load(file)
+    measured, failures = check(budget)
+
+    if args.update:
+        budget["budget_ms"] = {module: int(round(milliseconds * BUDGET_HEADROOM, -1)) or 10
+                               for module, milliseconds in measured.items()}
+        with open(args.budget, "w") as file:
+            json.dump(budget, file, indent=2)
+            file.write("\n")
+        print(f"Budgets updated in {args.budget}")
+    elif failures:
+        for failure in failures:
+            print(f"FAIL {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
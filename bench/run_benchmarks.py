@@ -0,0 +1,244 @@
+"""
+Benchmark suite for the simulation engines.
+
+Times demand generation and end-to-end runs of FixedOrderSupplyChain,
+OptimizedMLSupplyChain, sim_code.SupplyChain and the vectorized fixed-order batch
+engine over a grid of horizons and replication counts. For every case it reports
+throughput in simulated days per second and the peak traced memory. It also
+reports the import (startup) time of the core modules. Results are saved as JSON,
+and they can be compared against a stored baseline:
+
+    python bench/run_benchmarks.py --preset quick --output bench_results.json
+    python bench/run_benchmarks.py --preset quick --baseline bench/baseline.json --threshold 0.25
+    python bench/run_benchmarks.py --preset quick --save-baseline bench/baseline.json
+
+The exit status is 1 if any case regressed by more than the threshold.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import simpy
+from data_generator import DataGenerator
+from fast_fixed_order import draw_lead_times, simulate_fixed_order_batch
+from simulation_runner import build_suppliers, simulate
+
+# --------------------------
+# Benchmark Presets
+# --------------------------
+PRESETS = {
+    "quick": {"horizons": [100, 1_000, 10_000], "replications": [1, 10], "repeats": 3, "max_days": 100_000},
+    "full": {"horizons": [100, 1_000, 10_000, 100_000], "replications": [1, 10, 100, 1_000], "repeats": 3,
+             "max_days": 10_000_000},
+}
+# Simulated days (horizon x replications) per case are capped at max_days divided by this cost factor
+COST_FACTORS = {"demand_generation": 1, "fixed_order": 10, "optimized_ml": 100, "sim_code": 10, "fixed_order_batch": 1}
+STARTUP_MODULES = ["data_generator", "fixed_order_supply_chain", "optimized_ml_supply_chain", "simulation_runner",
+                   "sim_code"]
+STARTUP_REPEATS = 3
+DEFAULT_THRESHOLD = 0.2  # Relative slowdown that counts as a regression
+SEED = 1
+
+
+def make_demand(horizon, replications):
+    return DataGenerator(sim_days=horizon, seed=SEED).generate_demand_matrix(replications)
+
+
+def bench_demand_generation(horizon, replications, demand):
+    for replication in range(replications):
+        DataGenerator(sim_days=horizon, seed=replication).generate_demand_data()
+
+
+def bench_fixed_order(horizon, replications, demand):
+    from fixed_order_supply_chain import FixedOrderSupplyChain
+    np.random.seed(SEED)
+    for row in demand:
+        simulate(FixedOrderSupplyChain, row.tolist(), sim_days=horizon, suppliers=build_suppliers(SEED))
+
+
+def bench_optimized_ml(horizon, replications, demand):
+    from optimized_ml_supply_chain import OptimizedMLSupplyChain
+    np.random.seed(SEED)
+    for row in demand:
+        simulate(OptimizedMLSupplyChain, row.tolist(), sim_days=horizon, suppliers=build_suppliers(SEED))
+
+
+def bench_sim_code(horizon, replications, demand):
+    from sim_code import SupplyChain
+    np.random.seed(SEED)
+    for replication in range(replications):
+        env = simpy.Environment()
+        SupplyChain(env, horizon=horizon)
+        env.run(until=horizon)
+
+
+def bench_fixed_order_batch(horizon, replications, demand):
+    supplier = next(s for s in build_suppliers(SEED) if s.name == "Normal")
+    lead_times = draw_lead_times(replications, horizon, np.random.default_rng(SEED))
+    simulate_fixed_order_batch(demand, lead_times, supplier)
+
+
+BENCHMARKS = {
+    "demand_generation": bench_demand_generation,
+    "fixed_order": bench_fixed_order,
+    "optimized_ml": bench_optimized_ml,
+    "sim_code": bench_sim_code,
+    "fixed_order_batch": bench_fixed_order_batch,
+}
+
+
+def run_case(name, horizon, replications, repeats, measure_memory):
+    """Best-of-repeats wall time of one case, plus its peak traced memory in a separate run."""
+    bench = BENCHMARKS[name]
+    demand = make_demand(horizon, replications)
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        bench(horizon, replications, demand)
+        timings.append(time.perf_counter() - start)
+
+    peak_memory = None
+    if measure_memory:
+        gc.collect()
+        tracemalloc.start()
+        bench(horizon, replications, demand)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    seconds = min(timings)
+    return {
+        "benchmark": name,
+        "horizon": horizon,
+        "replications": replications,
+        "seconds": seconds,
+        "days_per_second": horizon * replications / seconds,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def measure_startup(module, repeats=STARTUP_REPEATS):
+    """Best-of-repeats time of a fresh interpreter importing module, run in a scratch directory."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    timings = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", f"import {module}"], cwd=scratch, env=env, check=True,
+                           stdout=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_suite(preset, benchmarks=None, measure_memory=True, startup=True):
+    config = PRESETS[preset]
+    results = []
+    for name in benchmarks or BENCHMARKS:
+        budget = config["max_days"] // COST_FACTORS[name]
+        for horizon in config["horizons"]:
+            for replications in config["replications"]:
+                if horizon * replications > budget:
+                    continue
+                result = run_case(name, horizon, replications, config["repeats"], measure_memory)
+                results.append(result)
+                print(f"{name:<18} horizon={horizon:<7} reps={replications:<5} "
+                      f"{result['days_per_second']:>14,.0f} days/s  {result['seconds']:.3f}s", flush=True)
+
+    startup_seconds = {}
+    if startup:
+        for module in STARTUP_MODULES:
+            startup_seconds[module] = measure_startup(module)
+            print(f"import {module:<28} {startup_seconds[module]:.3f}s", flush=True)
+
+    return {
+        "meta": {
+            "preset": preset,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "simpy": getattr(simpy, "__version__", None),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+        "startup_seconds": startup_seconds,
+    }
+
+
+def case_key(result):
+    return result["benchmark"], result["horizon"], result["replications"]
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns a list of regressions: cases whose throughput fell, or modules whose
+    startup time rose, by more than threshold relative to the baseline.
+    """
+    regressions = []
+    baseline_results = {case_key(result): result for result in baseline["results"]}
+    for result in current["results"]:
+        reference = baseline_results.get(case_key(result))
+        if reference is None:
+            continue
+        ratio = result["days_per_second"] / reference["days_per_second"]
+        if ratio < 1 - threshold:
+            regressions.append({"case": "{} horizon={} reps={}".format(*case_key(result)), "metric": "days_per_second",
+                                "baseline": reference["days_per_second"], "current": result["days_per_second"],
+                                "ratio": ratio})
+    for module, seconds in current["startup_seconds"].items():
+        reference = baseline.get("startup_seconds", {}).get(module)
+        if reference is None:
+            continue
+        ratio = seconds / reference
+        if ratio > 1 + threshold:
+            regressions.append({"case": f"import {module}", "metric": "startup_seconds", "baseline": reference,
+                                "current": seconds, "ratio": ratio})
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks the simulation engines.")
+    parser.add_argument("--preset", choices=PRESETS, default="quick")
+    parser.add_argument("--benchmark", action="append", choices=BENCHMARKS, help="run only these benchmarks")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file for the results")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown reported as a regression (default 0.2)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also save the results as the new baseline")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory runs")
+    parser.add_argument("--no-startup", action="store_true", help="skip the module import timings")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    current = run_suite(args.preset, args.benchmark, measure_memory=not args.no_memory, startup=not args.no_startup)
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as file:
+            json.dump(current, file, indent=2)
+        print(f"Benchmark results saved to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(current, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['case']}: {regression['metric']} {regression['baseline']:.4g} -> "
+                  f"{regression['current']:.4g} ({regression['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
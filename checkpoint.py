@@ -0,0 +1,215 @@
+import os
+import pickle
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import simpy
+from demand_stream import DemandStream, demand_length
+from event_log import SILENT_LOG
+from instrumentation import NULL_PROFILER
+from simulation_runner import summarize
+
+# --------------------------
+# Checkpoint Settings
+# --------------------------
+SNAPSHOT_MAGIC = b"NXSNAP1\n"  # File header of a compressed snapshot
+COMPRESSION_LEVEL = 6  # zlib level; snapshots are small, so favor size over speed
+DEFAULT_CHECKPOINT_DAYS = 100  # Days between periodic snapshots
+
+# Policy attributes that are not saved: the SimPy environment, output and
+# instrumentation hooks, the demand (saved separately) and the prefix-sum arrays
+# that event-driven runs rebuild from the demand
+EXCLUDED_ATTRIBUTES = {"env", "sink", "profiler", "event_log", "demand_data", "demand_array", "cumulative_demand",
+                       "cumulative_demand_sums", "cumulative_squares"}
+
+
+def compress(payload):
+    return SNAPSHOT_MAGIC + zlib.compress(payload, COMPRESSION_LEVEL)
+
+
+def decompress(data):
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise ValueError("Not a snapshot: missing header")
+    return zlib.decompress(data[len(SNAPSHOT_MAGIC):])
+
+
+def write_atomic(path, data):
+    """Writes data to path via a temporary file, so a crash never leaves a partial file behind."""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+
+def save_object(obj, path):
+    """Writes obj as a compressed pickle, replacing path atomically."""
+    write_atomic(path, compress(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)))
+
+
+def load_object(path):
+    with open(path, "rb") as file:
+        return pickle.loads(decompress(file.read()))
+
+
+class Snapshot:
+    """
+    The state of a FixedOrderSupplyChain or OptimizedMLSupplyChain run between two days.
+
+    A snapshot holds the policy's attributes: the store, pending orders, suppliers
+    and their RNGs, accumulated totals, and the ML training data and model. It also
+    holds the demand series (unless include_demand=False) and the global np.random
+    state, as one pickle. Every restore() unpickles a fresh copy, so one snapshot can
+    seed any number of independent continuations. Runs continue from the policy's
+    next_day, the first day it had not yet simulated.
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    @classmethod
+    def capture(cls, supply_chain, include_demand=True):
+        demand = supply_chain.demand_data if include_demand else None
+        demand_is_list = isinstance(demand, list)
+        if demand is not None and not isinstance(demand, DemandStream):
+            demand = np.asarray(demand, dtype=np.int64)
+        state = {name: value for name, value in vars(supply_chain).items() if name not in EXCLUDED_ATTRIBUTES}
+        return cls(pickle.dumps({
+            "policy_class": type(supply_chain),
+            "next_day": supply_chain.next_day,
+            "state": state,
+            "demand": demand,
+            "demand_is_list": demand_is_list,
+            "global_rng_state": np.random.get_state(),
+        }, pickle.HIGHEST_PROTOCOL))
+
+    @property
+    def next_day(self):
+        return pickle.loads(self.payload)["next_day"]
+
+    def to_bytes(self):
+        return compress(self.payload)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(decompress(data))
+
+    def save(self, path):
+        write_atomic(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    def restore(self, env=None, demand_data=None, sink=None, profiler=None, event_log=None, restore_global_rng=True):
+        """
+        Rebuilds the policy and schedules it to continue from next_day. By default it runs
+        in a new simpy.Environment whose clock starts at next_day. Pass demand_data
+        to continue with other demand (required if the snapshot was saved without it).
+        Also restores the global np.random state unless restore_global_rng=False.
+        """
+        snapshot = pickle.loads(self.payload)
+        if demand_data is None:
+            demand_data = snapshot["demand"]
+            if demand_data is None:
+                raise ValueError("Snapshot was saved without demand; pass demand_data")
+            if snapshot["demand_is_list"]:
+                demand_data = demand_data.tolist()
+
+        next_day = snapshot["next_day"]
+        supply_chain = snapshot["policy_class"].__new__(snapshot["policy_class"])
+        vars(supply_chain).update(snapshot["state"])
+        supply_chain.env = env if env is not None else simpy.Environment(initial_time=next_day)
+        supply_chain.demand_data = demand_data
+        supply_chain.n_days = demand_length(demand_data)
+        supply_chain.sink = sink
+        supply_chain.profiler = profiler if profiler is not None else NULL_PROFILER
+        supply_chain.event_log = event_log if event_log is not None else SILENT_LOG
+        if restore_global_rng:
+            np.random.set_state(snapshot["global_rng_state"])
+
+        run = supply_chain.run_event_driven if supply_chain.event_driven else supply_chain.run
+        supply_chain.env.process(run(next_day))
+        return supply_chain
+
+    def fork(self, n, **restore_kwargs):
+        """Restores n independent copies of the run, e.g. to try what-if changes on each."""
+        return [self.restore(**restore_kwargs) for _ in range(n)]
+
+
+class Checkpointer:
+    """
+    SimPy process that saves a Snapshot of supply_chain to path every every_days days,
+    overwriting the previous one, so a run that dies can resume from the last save.
+    """
+
+    def __init__(self, env, supply_chain, path, every_days=DEFAULT_CHECKPOINT_DAYS, include_demand=True):
+        self.env = env
+        self.supply_chain = supply_chain
+        self.path = path
+        self.every_days = every_days
+        self.include_demand = include_demand
+        self.saves = 0
+        self.env.process(self.run())
+
+    def run(self):
+        while True:
+            yield self.env.timeout(self.every_days)
+            self.save()
+
+    def save(self):
+        Snapshot.capture(self.supply_chain, self.include_demand).save(self.path)
+        self.saves += 1
+
+
+def reseed(supply_chain, seed):
+    """
+    Gives a restored run fresh random streams derived from seed: the global np.random
+    stream and each supplier's lead-time generator, with any buffered draws dropped.
+    """
+    global_seed, supplier_seed = np.random.SeedSequence(seed).spawn(2)
+    np.random.seed(global_seed.generate_state(1)[0])
+    suppliers = supply_chain.suppliers if hasattr(supply_chain, "suppliers") else [supply_chain.supplier]
+    for supplier, child in zip(suppliers, supplier_seed.spawn(len(suppliers))):
+        supplier.rng = np.random.default_rng(child)
+        supplier.delivery_times = np.empty(0, dtype=np.int64)
+        supplier.next_delivery_time = 0
+
+
+def run_fork(snapshot, scenario=None, until=None):
+    """
+    Continues one copy of a snapshot and returns its simulation_runner.summarize dict.
+
+    scenario maps policy attribute names to new values, e.g. {"reorder_threshold": 60}
+    for the fixed policy or {"safety_std_factor": 1.5} for the ML one. A "seed" entry
+    reseeds the copy's random streams, and a "demand_data" entry replaces its future
+    demand. Keys that are not existing, non-method attributes raise ValueError, so a
+    misspelled key cannot silently run the baseline scenario.
+    """
+    if isinstance(snapshot, bytes):
+        snapshot = Snapshot.from_bytes(snapshot)
+    scenario = dict(scenario or {})
+    seed = scenario.pop("seed", None)
+    supply_chain = snapshot.restore(demand_data=scenario.pop("demand_data", None))
+    if seed is not None:
+        reseed(supply_chain, seed)
+    for name, value in scenario.items():
+        if not hasattr(supply_chain, name) or callable(getattr(supply_chain, name)):
+            raise ValueError(f"Scenario key {name!r} is not a setting of {type(supply_chain).__name__}")
+        setattr(supply_chain, name, value)
+    supply_chain.env.run(until=until if until is not None else supply_chain.n_days)
+    return summarize(supply_chain.store, supply_chain)
+
+
+def run_forks(snapshot, scenarios, until=None, max_workers=1):
+    """
+    Runs one continuation of snapshot per scenario (see run_fork) and returns their
+    summaries in order. With max_workers > 1 they run in a process pool, and each
+    worker receives only the compressed snapshot bytes.
+    """
+    if max_workers == 1:
+        return [run_fork(snapshot, scenario, until) for scenario in scenarios]
+    data = snapshot.to_bytes()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(run_fork, data, scenario, until) for scenario in scenarios]
+        return [future.result() for future in futures]
@@ -1,9 +1,10 @@
 import numpy as np
+from instrumentation import NULL_PROFILER
 
 class DataGenerator:
     """
     Generates realistic demand data for a supply chain simulation.
-    
+
     Parameetrs:
         sim_days (int): Number of days to simulate.
         seasonality_factor (float): Strength of seasonal demand fluctuations.
@@ -11,27 +12,68 @@ class DataGenerator:
         volatility (float): Standard deviation of random noise in demand.
         shock_prob (float): Probability of a sudden demand spike or drop.
         seed (int, optional): Random seed for reproducibility.
+        profiler (Profiler, optional): Times demand generation as the "demand_generation" phase.
+
+    Each generator draws from its own np.random.Generator, so several generators
+    can run side by side without touching the global np.random state.
     """
 
-    def __init__(self, sim_days=100, seasonality_factor=5, trend_factor=0, volatility=3, shock_prob=0.1, seed=None):
+    def __init__(self, sim_days=100, seasonality_factor=5, trend_factor=0, volatility=3, shock_prob=0.1, seed=None, profiler=None):
         self.sim_days = sim_days
         self.seasonality_factor = seasonality_factor
         self.trend_factor = trend_factor
         self.volatility = volatility
         self.shock_prob = shock_prob
-        if seed is not None:
-            np.random.seed(seed)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+
 
-    
     #Calculates daily demand with seasonality, noise, trend, and occasional shocks.
     def seasonal_demand(self, day):
-        base_demand = 10 + self.seasonality_factor * np.sin(2 * np.pi * day / np.random.randint(25, 35))
-        noise = np.random.normal(0, self.volatility)
+        base_demand = 10 + self.seasonality_factor * np.sin(2 * np.pi * day / self.rng.integers(25, 35))
+        noise = self.rng.normal(0, self.volatility)
         trend = self.trend_factor * day
-        shock = np.random.choice([-1, 1]) * np.random.randint(10, 30) if np.random.rand() < self.shock_prob else 0
+        shock = self.rng.choice([-1, 1]) * self.rng.integers(10, 30) if self.rng.random() < self.shock_prob else 0
         return max(0, int(base_demand + noise + trend + shock))
 
-    
+
+    #Generates a (n_series, sim_days) matrix of daily demand in one vectorized pass.
+    def generate_demand_matrix(self, n_series=1):
+        return self.generate_demand_block(0, self.sim_days, n_series)
+
+
+    #Generates a (n_series, n_days) block of daily demand for days start_day .. start_day + n_days - 1.
+    def generate_demand_block(self, start_day, n_days, n_series=1):
+        with self.profiler.phase("demand_generation"):
+            return self._demand_block(start_day, n_days, n_series)
+
+
+    def _demand_block(self, start_day, n_days, n_series):
+        shape = (n_series, n_days)
+        days = np.arange(start_day, start_day + n_days)
+
+        periods = self.rng.integers(25, 35, size=shape)
+        base_demand = 10 + self.seasonality_factor * np.sin(2 * np.pi * days / periods)
+        noise = self.rng.normal(0, self.volatility, size=shape)
+        trend = self.trend_factor * days
+
+        shocked = self.rng.random(shape) < self.shock_prob
+        shock_sign = self.rng.choice([-1, 1], size=shape)
+        shock_size = self.rng.integers(10, 30, size=shape)
+        shock = np.where(shocked, shock_sign * shock_size, 0)
+
+        # int() truncates toward zero, then demand is floored at zero
+        demand = np.trunc(base_demand + noise + trend + shock)
+        return np.maximum(demand, 0).astype(np.int64)
+
+
+    #Returns a generator with the same demand parameters that draws from seed instead.
+    def reseeded(self, seed):
+        return DataGenerator(self.sim_days, self.seasonality_factor, self.trend_factor, self.volatility,
+                             self.shock_prob, seed=seed, profiler=self.profiler)
+
+
     #Generates a list of daily demand values based on configured parameters.
     def generate_demand_data(self):
-        return [self.seasonal_demand(day) for day in range(self.sim_days)]
+        return self.generate_demand_matrix(1)[0].tolist()
@@ -0,0 +1,156 @@
+import csv
+from itertools import islice
+import numpy as np
+
+# --------------------------
+# Streaming Parameters
+# --------------------------
+DEFAULT_CHUNK_DAYS = 4096  # Days of demand per block
+SYNTHETIC_BLOCK_DAYS = 1024  # Days drawn from each child stream of a SyntheticDemandStream
+DEMAND_COLUMN = "Demand"  # CSV/.npy column read by default, as written by result_sink.FIXED_ORDER_COLUMNS
+
+
+class DemandStream:
+    """
+    Daily demand delivered as consecutive int64 NumPy blocks of up to chunk_days days,
+    so a run only ever holds one block in memory.
+
+    n_days is the length of the stream, or None if it is unbounded or not known in
+    advance. Every call to blocks() starts again from the first day. Store keeps
+    every day's demand, so pair long streams with CompactStore(keep_history=False).
+
+    Both policies accept a stream as demand_data, except in event-driven runs. The
+    fixed policy's default sink then flushes once per block. The ML policy's
+    demand window is O(lookback); pass max_training_samples to also bound the
+    observations kept for its delay model.
+    """
+
+    def __init__(self, n_days=None, chunk_days=DEFAULT_CHUNK_DAYS):
+        self.n_days = n_days
+        self.chunk_days = chunk_days
+
+    def blocks(self):
+        raise NotImplementedError
+
+    def __iter__(self):
+        return self.blocks()
+
+    def days(self):
+        """Yields the demand of each day as a Python int."""
+        for block in self.blocks():
+            yield from block.tolist()
+
+
+class SyntheticDemandStream(DemandStream):
+    """
+    Generates demand block by block with a DataGenerator's parameters. n_days=None
+    streams forever.
+
+    Days are drawn in fixed blocks of SYNTHETIC_BLOCK_DAYS, block b from child b of
+    the generator's seed, so each day's demand depends only on the seed and the day.
+    It does not depend on chunk_days or n_days, and every call to blocks() (e.g. a
+    replay when resuming from a checkpoint) sees the same demand. The series is not
+    the one generate_demand_data() draws for the same seed, since that draws the
+    whole horizon in one pass; an unseeded generator gets fresh entropy once, here.
+    """
+
+    def __init__(self, generator, n_days=None, chunk_days=DEFAULT_CHUNK_DAYS):
+        super().__init__(n_days, chunk_days)
+        self.generator = generator
+        seed = generator.seed
+        self.seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+    def synthetic_block(self, index):
+        """Days index * SYNTHETIC_BLOCK_DAYS onwards, drawn from the index-th child of the seed."""
+        child = np.random.SeedSequence(self.seed_seq.entropy, spawn_key=self.seed_seq.spawn_key + (index,))
+        return self.generator.reseeded(child).generate_demand_block(index * SYNTHETIC_BLOCK_DAYS,
+                                                                    SYNTHETIC_BLOCK_DAYS)[0]
+
+    def blocks(self):
+        buffered = np.empty(0, dtype=np.int64)
+        next_block = 0
+        start = 0
+        while self.n_days is None or start < self.n_days:
+            n = self.chunk_days if self.n_days is None else min(self.chunk_days, self.n_days - start)
+            while len(buffered) < n:
+                buffered = np.concatenate([buffered, self.synthetic_block(next_block)])
+                next_block += 1
+            yield buffered[:n]
+            buffered = buffered[n:]
+            start += n
+
+
+class ArrayDemandStream(DemandStream):
+    """Streams a 1-D array-like, e.g. a list or a memory-mapped array, in blocks."""
+
+    def __init__(self, demand, chunk_days=DEFAULT_CHUNK_DAYS):
+        super().__init__(len(demand), chunk_days)
+        self.demand = demand
+
+    def blocks(self):
+        for start in range(0, self.n_days, self.chunk_days):
+            yield np.asarray(self.demand[start:start + self.chunk_days], dtype=np.int64)
+
+
+class MemmapDemandStream(ArrayDemandStream):
+    """
+    Streams demand from a file without loading it: a .npy file (a plain 1-D array,
+    or a structured one such as ColumnarSink's .npy output, read via column), or
+    any other file as raw values of the given dtype.
+    """
+
+    def __init__(self, path, column=None, dtype=np.int64, chunk_days=DEFAULT_CHUNK_DAYS):
+        if str(path).endswith(".npy"):
+            demand = np.load(path, mmap_mode="r")
+            if demand.dtype.names:
+                demand = demand[column or DEMAND_COLUMN]
+        else:
+            demand = np.memmap(path, dtype=dtype, mode="r")
+        super().__init__(demand, chunk_days)
+        self.path = path
+        self.column = column
+        self.dtype = dtype
+
+    def __reduce__(self):
+        # Pickle (e.g. into a checkpoint) as the file reference, not the mapped data
+        return MemmapDemandStream, (self.path, self.column, self.dtype, self.chunk_days)
+
+
+class CsvDemandStream(DemandStream):
+    """
+    Reads one column of a CSV file in chunks of chunk_days rows. column is a header
+    name, or a column index for files without a header row.
+    """
+
+    def __init__(self, path, column=DEMAND_COLUMN, n_days=None, chunk_days=DEFAULT_CHUNK_DAYS):
+        super().__init__(n_days, chunk_days)
+        self.path = path
+        self.column = column
+
+    def blocks(self):
+        with open(self.path, newline="") as file:
+            reader = csv.reader(file)
+            index = self.column
+            if isinstance(self.column, str):
+                index = next(reader).index(self.column)
+            remaining = self.n_days
+            while remaining is None or remaining > 0:
+                n = self.chunk_days if remaining is None else min(self.chunk_days, remaining)
+                rows = list(islice(reader, n))
+                if not rows:
+                    return
+                yield np.array([int(float(row[index])) for row in rows], dtype=np.int64)
+                if remaining is not None:
+                    remaining -= len(rows)
+
+
+def daily_demand(demand):
+    """Yields each day's demand from a list/array or a DemandStream."""
+    if isinstance(demand, DemandStream):
+        return demand.days()
+    return iter(demand)
+
+
+def demand_length(demand):
+    """Number of days of demand, or None for a stream of unknown length."""
+    return demand.n_days if isinstance(demand, DemandStream) else len(demand)
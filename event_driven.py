@@ -0,0 +1,53 @@
+import numpy as np
+
+# Helpers for event-driven runs: between events (order arrivals and reorder decisions)
+# inventory only falls by the known demand, so a quiet stretch of days can be found
+# with searchsorted over cumulative demand and accounted for in closed form.
+#
+# Both policies take event_driven=True and then only wake up on those event days,
+# with the same totals as their day-by-day runs. FixedOrderSupplyChain finds the day
+# the reorder point is crossed and logs the quiet days to its sink in bulk.
+# OptimizedMLSupplyChain scans its rolling reorder thresholds over the demand with
+# array operations, which needs demand_feature="mean". Event-driven runs need the
+# whole demand series up front, so they do not accept a demand_stream.DemandStream.
+
+
+def prefix_sums(demand):
+    """Returns cumulative demand and the cumulative sum of cumulative demand as int64 arrays."""
+    cumulative = np.cumsum(demand, dtype=np.int64)
+    return cumulative, np.cumsum(cumulative, dtype=np.int64)
+
+
+def total_before(cumulative, day):
+    """Sum of the underlying series over days [0, day)."""
+    return int(cumulative[day - 1]) if day > 0 else 0
+
+
+def first_day_below(cumulative, start, end, inventory, threshold):
+    """
+    First day t in [start, end) on which inventory, reduced by the demand of days
+    start..t with nothing arriving, is below threshold. Returns end if there is none.
+    """
+    target = total_before(cumulative, start) + inventory - threshold
+    day = int(np.searchsorted(cumulative, target, side="right"))
+    return min(max(day, start), end)
+
+
+def held_units(cumulative, cumulative_sums, start, end, inventory):
+    """
+    Sum over days t in [start, end) of the end-of-day inventory max(0, inventory - demand
+    of days start..t), i.e. the unit-days that holding costs are charged on.
+    """
+    base = total_before(cumulative, start)
+    stockout_day = int(np.searchsorted(cumulative, base + inventory, side="left"))
+    in_stock_until = min(max(stockout_day, start), end)
+    days_in_stock = in_stock_until - start
+    if days_in_stock == 0:
+        return 0
+    return days_in_stock * (inventory + base) - (total_before(cumulative_sums, in_stock_until) -
+                                                 total_before(cumulative_sums, start))
+
+
+def inventory_path(inventory, demand):
+    """End-of-day inventory over consecutive days of demand with nothing arriving."""
+    return np.maximum(inventory - np.cumsum(demand, dtype=np.int64), 0)
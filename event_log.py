@@ -0,0 +1,135 @@
+import logging
+from collections import deque
+
+# --------------------------
+# Verbosity Levels
+# --------------------------
+QUIET = 0  # Nothing is recorded
+SUMMARY = 1  # End-of-run results only
+ORDERS = 2  # Orders placed and received
+DAILY = 3  # Every simulated day
+
+VERBOSITY_LEVELS = {"quiet": QUIET, "summary": SUMMARY, "orders": ORDERS, "daily": DAILY}
+
+# --------------------------
+# Event Kinds
+# --------------------------
+DAY = "day"
+ORDER_PLACED = "order_placed"
+EMERGENCY_ORDER = "emergency_order"
+ORDER_RECEIVED = "order_received"
+RUN_SUMMARY = "run_summary"
+
+EVENT_LEVELS = {DAY: DAILY, ORDER_PLACED: ORDERS, EMERGENCY_ORDER: ORDERS, ORDER_RECEIVED: ORDERS,
+                RUN_SUMMARY: SUMMARY}
+
+EVENT_TEMPLATES = {
+    DAY: "Day {day}: Inventory = {inventory} | Demand: {demand}, Fulfilled: {fulfilled}",
+    ORDER_PLACED: "Day {day}: Order Placed: {quantity} units from {supplier} (Delivery in {delivery_time} days)",
+    EMERGENCY_ORDER: "Day {day}: Emergency Order Placed: {quantity} units from {supplier} (Delivery in {delivery_time} days)",
+    ORDER_RECEIVED: "Day {day}: Order of {quantity} units received from {supplier}. New Inventory = {inventory}",
+    RUN_SUMMARY: ("=== {model} Financial Summary ===\n"
+                  "Total Revenue: ${total_revenue:.2f}\n"
+                  "Total Supplier Cost: ${total_supplier_cost:.2f}\n"
+                  "Total Holding Cost: ${total_holding_cost:.2f}\n"
+                  "Total Stockout Cost: ${total_stockout_cost:.2f}\n"
+                  "Total Costs: ${total_costs:.2f}\n"
+                  "Profit: ${profit:.2f}\n"
+                  "ROI: {roi:.2f}%"),
+}
+
+
+class Event:
+    """One typed simulation event. Its message is only formatted when it is printed or logged."""
+
+    __slots__ = ("day", "kind", "fields")
+
+    def __init__(self, day, kind, fields):
+        self.day = day
+        self.kind = kind
+        self.fields = fields
+
+    def to_dict(self):
+        return dict(self.fields, day=self.day, kind=self.kind)
+
+    def __str__(self):
+        return EVENT_TEMPLATES[self.kind].format(day=self.day, **self.fields)
+
+    def __repr__(self):
+        return f"Event({self.to_dict()!r})"
+
+
+class EventLog:
+    """
+    Collects typed daily events from the supply chain models instead of printing them.
+    Both policies take one as event_log; without it they record into SILENT_LOG,
+    which drops every event before any message is built.
+
+    Events above the verbosity level are dropped before any message is built. Kept
+    events go to a bounded in-memory ring buffer, and optionally to a logging.Logger
+    (formatted lazily by the logging module) and/or to stdout.
+
+    Parameters:
+        level (int): QUIET, SUMMARY, ORDERS or DAILY.
+        capacity (int, optional): Events kept in the ring buffer; None keeps no buffer.
+        logger (logging.Logger, optional): Logger that receives every kept event at INFO.
+        echo (bool): Print kept events, like the models used to.
+        kinds (iterable, optional): Only keep events of these kinds.
+        sample_every (int): Keep one of every N events of each kind.
+        where (callable, optional): Predicate on the Event, called for every kept kind; events it rejects are dropped.
+    """
+
+    def __init__(self, level=QUIET, capacity=None, logger=None, echo=False, kinds=None, sample_every=1, where=None):
+        self.level = VERBOSITY_LEVELS[level] if isinstance(level, str) else level
+        self.events = deque(maxlen=capacity) if capacity else None
+        self.logger = logger
+        self.echo = echo
+        self.kinds = set(kinds) if kinds is not None else None
+        self.sample_every = sample_every
+        self.where = where
+        self.seen = {}
+        self.enabled_kinds = {kind for kind, kind_level in EVENT_LEVELS.items()
+                              if kind_level <= self.level and (self.kinds is None or kind in self.kinds)}
+
+    def enabled(self, kind):
+        return kind in self.enabled_kinds
+
+    def record(self, day, kind, **fields):
+        if kind not in self.enabled_kinds:
+            return
+        if self.sample_every > 1:
+            seen = self.seen.get(kind, 0)
+            self.seen[kind] = seen + 1
+            if seen % self.sample_every:
+                return
+        event = Event(day, kind, fields)
+        if self.where is not None and not self.where(event):
+            return
+        if self.events is not None:
+            self.events.append(event)
+        if self.logger is not None:
+            self.logger.info("%s", event)
+        if self.echo:
+            print(event)
+
+    def __len__(self):
+        return len(self.events) if self.events is not None else 0
+
+    def __iter__(self):
+        return iter(self.events if self.events is not None else ())
+
+    def to_records(self):
+        return [event.to_dict() for event in self]
+
+
+SILENT_LOG = EventLog(QUIET)
+
+
+def console_log(level=ORDERS):
+    """An EventLog that prints events at or below level as they happen."""
+    return EventLog(level, echo=True)
+
+
+def structured_log(level=DAILY, name="supply_chain", **kwargs):
+    """An EventLog that forwards events to the named logging.Logger."""
+    return EventLog(level, logger=logging.getLogger(name), **kwargs)
@@ -0,0 +1,98 @@
+import numpy as np
+from Store import INITIAL_INVENTORY, MAX_STORAGE_CAPACITY
+from fixed_order_supply_chain import (REORDER_POINT, ORDER_QUANTITY, SELLING_PRICE_PER_UNIT,
+                                      HOLDING_COST_PER_UNIT, STOCKOUT_PENALTY_PER_UNIT)
+
+# Lead time range used by FixedOrderSupplyChain when no lead times are supplied (randint bounds)
+DEFAULT_LEAD_TIME_RANGE = (4, 7)
+
+
+#Draws one lead time per possible order (at most one per day) for every replication.
+def draw_lead_times(n_replications, n_days, rng=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    return rng.integers(DEFAULT_LEAD_TIME_RANGE[0], DEFAULT_LEAD_TIME_RANGE[1], size=(n_replications, n_days))
+
+
+def simulate_fixed_order_batch(demand, lead_times, supplier, reorder_point=REORDER_POINT,
+                               order_quantity=ORDER_QUANTITY, initial_inventory=INITIAL_INVENTORY):
+    """
+    Simulates many independent (s, Q) replications of the fixed-order policy at once.
+
+    Parameters:
+        demand (array): (n_replications, n_days) daily demand, one row per replication.
+        lead_times (array): (n_replications, max_orders) delivery times; the k-th order
+            of a replication uses column k.
+        supplier (Supplier): Supplier whose get_cost prices every order.
+        reorder_point (int): Order when inventory drops below this level with nothing pending.
+        order_quantity (int): Units per order.
+        initial_inventory (int): Starting inventory of every replication.
+
+    The daily step mirrors FixedOrderSupplyChain.run (fulfill, receive, reorder) and
+    accumulates costs in the same order, so for the same demand and lead-time draws
+    the totals match the SimPy engine exactly. Returns a dict of per-replication arrays
+    with the same fields as simulation_runner.summarize plus the cost breakdown.
+    """
+    demand = np.atleast_2d(np.asarray(demand, dtype=np.int64))
+    lead_times = np.atleast_2d(np.asarray(lead_times, dtype=np.int64))
+    n_replications, n_days = demand.shape
+    max_orders = lead_times.shape[1]
+    order_cost = supplier.get_cost(order_quantity)
+
+    inventory = np.full(n_replications, initial_inventory, dtype=np.int64)
+    arrival_day = np.full(n_replications, -1, dtype=np.int64)  # -1 means no order pending
+    orders_placed = np.zeros(n_replications, dtype=np.int64)
+    orders_received = np.zeros(n_replications, dtype=np.int64)
+    stockouts = np.zeros(n_replications, dtype=np.int64)
+
+    total_revenue = np.zeros(n_replications)
+    total_supplier_cost = np.zeros(n_replications)
+    total_holding_costs = np.zeros(n_replications)
+    total_stockout_costs = np.zeros(n_replications)
+    total_costs = np.zeros(n_replications)
+
+    for day in range(n_days):
+        daily_demand = demand[:, day]
+        fulfilled = np.minimum(inventory, daily_demand)
+        inventory -= fulfilled
+        missed = daily_demand - fulfilled
+        stockouts += missed
+
+        daily_holding_cost = inventory * HOLDING_COST_PER_UNIT
+        daily_stockout_cost = missed * STOCKOUT_PENALTY_PER_UNIT
+        total_holding_costs += daily_holding_cost
+        total_stockout_costs += daily_stockout_cost
+        total_revenue += fulfilled * SELLING_PRICE_PER_UNIT
+
+        arriving = (arrival_day >= 0) & (arrival_day <= day)
+        inventory = np.where(arriving, np.minimum(inventory + order_quantity, MAX_STORAGE_CAPACITY), inventory)
+        arrival_day[arriving] = -1
+        orders_received += arriving
+
+        ordering = (inventory < reorder_point) & (arrival_day < 0)
+        if ordering.any():
+            order_index = orders_placed[ordering]
+            if order_index.max() >= max_orders:
+                raise ValueError(f"lead_times has {max_orders} columns but more orders were placed")
+            arrival_day[ordering] = day + lead_times[ordering, order_index]
+            orders_placed += ordering
+
+        daily_order_cost = ordering * order_cost
+        total_supplier_cost += daily_order_cost
+        total_costs += daily_order_cost + daily_holding_cost + daily_stockout_cost
+
+    profit = total_revenue - total_costs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(total_costs > 0, profit / total_costs * 100, 0.0)
+
+    return {
+        "total_revenue": total_revenue,
+        "total_costs": total_costs,
+        "profit": profit,
+        "roi": roi,
+        "stockouts": stockouts,
+        "orders_placed": orders_received,  # Matches summarize, which counts received orders
+        "final_inventory": inventory,
+        "total_supplier_cost": total_supplier_cost,
+        "total_holding_costs": total_holding_costs,
+        "total_stockout_costs": total_stockout_costs,
+    }
@@ -1,6 +1,12 @@
-import csv
+from itertools import islice
 import numpy as np
 import simpy
+from demand_stream import DemandStream, daily_demand, demand_length
+from event_log import SILENT_LOG, DAY, ORDER_PLACED, ORDER_RECEIVED, RUN_SUMMARY
+from instrumentation import NULL_PROFILER
+from event_driven import prefix_sums, first_day_below, held_units, inventory_path
+from order_book import OrderBook
+from result_sink import ColumnarSink, FIXED_ORDER_COLUMNS, with_string_width
 
 REORDER_POINT = 50  # Inventory level at which an order is triggered
 ORDER_QUANTITY = 100  # Number of units ordered each time
@@ -11,119 +17,196 @@ STOCKOUT_PENALTY_PER_UNIT = 10
 class FixedOrderSupplyChain:
     """
     Implements a fixed-order supply chain model with accurate financial tracking
-    and real-time CSV export for easier graphing and analysis.
+    and buffered CSV export for easier graphing and analysis.
     """
-    def __init__(self, env, store, supplier, demand_data, csv_filename="fixed_order_simulation.csv"):
+    def __init__(self, env, store, supplier, demand_data, csv_filename="fixed_order_simulation.csv", lead_times=None,
+                 sink=None, event_driven=False, reorder_point=REORDER_POINT, order_quantity=ORDER_QUANTITY,
+                 profiler=None, event_log=None):
         self.env = env
         self.store = store
         self.supplier = supplier
+        if event_driven and isinstance(demand_data, DemandStream):
+            raise ValueError("event_driven runs need demand_data as a list or array, not a DemandStream")
         self.demand_data = demand_data
-        self.reorder_threshold = REORDER_POINT
-        self.reorder_quantity = ORDER_QUANTITY
-        self.pending_orders = []
+        self.n_days = demand_length(demand_data)
+        self.event_driven = event_driven
+        self.reorder_threshold = reorder_point
+        self.reorder_quantity = order_quantity
+        self.pending_orders = OrderBook()
+        # The k-th order uses lead_times[k] instead of a fresh np.random draw, as fast_fixed_order does
+        if isinstance(lead_times, np.ndarray):
+            lead_times = lead_times.tolist()  # A list iterator can be pickled into a checkpoint
+        self.lead_times = iter(lead_times) if lead_times is not None else None
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.event_log = event_log if event_log is not None else SILENT_LOG
         
         self.total_supplier_cost = 0
         self.total_holding_costs = 0
         self.total_stockout_costs = 0
         self.total_revenue = 0
         self.total_costs = 0
+        self.next_day = 0
         
         self.csv_filename = csv_filename
         
-        # Initialize CSV logging
-        self.init_csv()
+        # Initialize result logging: by default a sink that writes csv_filename in bulk. Pass a
+        # result_sink.ColumnarSink for other formats or flushing, or csv_filename=None to disable it
+        if sink is None and self.csv_filename is not None:
+            columns = with_string_width(FIXED_ORDER_COLUMNS, "Supplier", len(supplier.name))
+            if isinstance(demand_data, DemandStream):
+                sink = ColumnarSink(columns, self.n_days or demand_data.chunk_days, path=self.csv_filename,
+                                    flush_every=demand_data.chunk_days)
+            else:
+                sink = ColumnarSink(columns, self.n_days, path=self.csv_filename)
+        self.sink = sink
+        
+        self.env.process(self.run_event_driven() if event_driven else self.run())
+
+    def run(self, start_day=0):
+        for day, demand in enumerate(islice(daily_demand(self.demand_data), start_day, None), start_day):
+            self.step(day, demand)
+            yield self.env.timeout(1)
         
-        self.env.process(self.run())
+        # Streams of unknown length only end here; known lengths finish in step()
+        if self.n_days is None:
+            self.finish()
+
+    def run_event_driven(self, start_day=0):
+        n_days = self.n_days
+        self.demand_array = np.asarray(self.demand_data, dtype=np.int64)
+        self.cumulative_demand, self.cumulative_demand_sums = prefix_sums(self.demand_array)
+
+        day = start_day
+        while day < n_days:
+            event_day = self.next_event_day(day, n_days)
+            if event_day > day:
+                with self.profiler.phase("skip_quiet_days"):
+                    self.skip_quiet_days(day, event_day)
+                yield self.env.timeout(event_day - day)
+                day = event_day
+            if day < n_days:
+                self.step(day)
+                yield self.env.timeout(1)
+                day += 1
 
-    def init_csv(self):
-        """Initialize CSV file with headers."""
-        with open(self.csv_filename, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                "Day", "Inventory", "Demand", "Fulfilled", "Stockouts", "Order Quantity", 
-                "Supplier", "Holding Cost", "Stockout Cost", "Supplier Cost", "Revenue", "Profit", "ROI"
-            ])
+    def next_event_day(self, day, n_days):
+        """Next day on which an order arrives or inventory falls below the reorder point."""
+        arrival_day = self.pending_orders.next_arrival_day()
+        if arrival_day is not None:
+            return min(max(arrival_day, day), n_days)
+        return first_day_below(self.cumulative_demand, day, n_days, self.store.inventory, self.reorder_threshold)
 
-    def run(self):
-        for day in range(len(self.demand_data)):
-            print(f"Day {day}: Inventory = {self.store.inventory}", end=" ")
-            
+    def skip_quiet_days(self, start, end):
+        """Accounts for days [start, end), on which no order arrives or is placed, in closed form."""
+        demand = self.demand_array[start:end]
+        inventory = self.store.inventory
+        held = held_units(self.cumulative_demand, self.cumulative_demand_sums, start, end, inventory)
+        fulfilled = self.store.fulfill_demand_series(demand)
+        missed = int(demand.sum()) - fulfilled
+
+        holding_cost = held * HOLDING_COST_PER_UNIT
+        stockout_cost = missed * STOCKOUT_PENALTY_PER_UNIT
+        self.total_holding_costs += holding_cost
+        self.total_stockout_costs += stockout_cost
+        self.total_revenue += fulfilled * SELLING_PRICE_PER_UNIT
+        self.total_costs += holding_cost + stockout_cost
+        self.next_day = end
+
+        if self.sink is not None:
+            self.log_quiet_days(start, end, demand, inventory)
+        if end == self.n_days:
+            self.finish()
+
+    def log_quiet_days(self, start, end, demand, inventory):
+        """Logs the rows of skipped quiet days to the result sink in one block."""
+        inventory_levels = inventory_path(inventory, demand)
+        fulfilled = np.concatenate(([inventory], inventory_levels[:-1])) - inventory_levels
+        missed = demand - fulfilled
+        holding_costs = inventory_levels * HOLDING_COST_PER_UNIT
+        stockout_costs = missed * float(STOCKOUT_PENALTY_PER_UNIT)
+        revenue = fulfilled * float(SELLING_PRICE_PER_UNIT)
+        today_costs = holding_costs + stockout_costs
+        profit = revenue - today_costs
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roi = np.where(today_costs > 0, (profit / today_costs) * 100, 0.0)
+        n_days = end - start
+        self.sink.extend(np.arange(start, end), inventory_levels, demand, fulfilled, missed, np.zeros(n_days),
+                         np.full(n_days, "None"), holding_costs, stockout_costs, np.zeros(n_days), revenue, profit, roi)
+
+    def step(self, day, demand=None):
+        """Simulates one day: fulfill demand, receive orders, reorder and log."""
+        opening_inventory = self.store.inventory
+        if demand is None:
             demand = self.demand_data[day]
+        with self.profiler.phase("fulfill_demand"):
             fulfilled = self.store.fulfill_demand(demand)
-            print(f"| Demand: {demand}, Fulfilled: {fulfilled}", end=" ")
-            
-            daily_holding_cost = self.store.inventory * HOLDING_COST_PER_UNIT
-            daily_stockout_cost = (demand - fulfilled) * STOCKOUT_PENALTY_PER_UNIT if fulfilled < demand else 0
-            
-            self.total_holding_costs += daily_holding_cost
-            self.total_stockout_costs += daily_stockout_cost
-            
-            revenue = fulfilled * SELLING_PRICE_PER_UNIT
-            self.total_revenue += revenue
-            
+        self.event_log.record(day, DAY, inventory=opening_inventory, demand=demand, fulfilled=fulfilled)
+        
+        daily_holding_cost = self.store.inventory * HOLDING_COST_PER_UNIT
+        daily_stockout_cost = (demand - fulfilled) * STOCKOUT_PENALTY_PER_UNIT if fulfilled < demand else 0
+        
+        self.total_holding_costs += daily_holding_cost
+        self.total_stockout_costs += daily_stockout_cost
+        
+        revenue = fulfilled * SELLING_PRICE_PER_UNIT
+        self.total_revenue += revenue
+        
+        with self.profiler.phase("receive_orders"):
             self.receive_pending_orders()
-            
-            order_quantity = 0
-            supplier_name = "None"
-            order_cost = 0 
-            
-            if self.store.inventory < self.reorder_threshold and len(self.pending_orders) == 0:
-                delivery_time = np.random.randint(4, 7)
+        
+        order_quantity = 0
+        supplier_name = "None"
+        order_cost = 0 
+        
+        if self.store.inventory < self.reorder_threshold and len(self.pending_orders) == 0:
+            with self.profiler.phase("reorder"):
+                delivery_time = next(self.lead_times) if self.lead_times is not None else np.random.randint(4, 7)
                 order_quantity = self.reorder_quantity
                 order_cost = self.supplier.get_cost(order_quantity)
                 self.total_supplier_cost += order_cost
-                self.pending_orders.append((self.env.now + delivery_time, order_quantity, self.supplier.name))
+                self.pending_orders.add(self.env.now + delivery_time, order_quantity, self.supplier.name)
                 supplier_name = self.supplier.name
-                print(f"| Order Placed: {order_quantity} units from {supplier_name} (Delivery in {delivery_time} days)", end=" ")
-            
-            today_costs = order_cost + daily_holding_cost + daily_stockout_cost
-            self.total_costs += today_costs
-            profit = revenue - today_costs
-            roi = (profit / today_costs) * 100 if today_costs > 0 else 0
-            
-            # Log data to CSV
-            self.log_to_csv(day, self.store.inventory, demand, fulfilled, demand - fulfilled, order_quantity, 
-                            supplier_name, daily_holding_cost, daily_stockout_cost, revenue, profit, roi)
-            
-            print()
-            yield self.env.timeout(1)
+            self.event_log.record(day, ORDER_PLACED, quantity=order_quantity, supplier=supplier_name,
+                                  delivery_time=delivery_time)
         
-        self.compute_final_roi()
+        today_costs = order_cost + daily_holding_cost + daily_stockout_cost
+        self.total_costs += today_costs
+        profit = revenue - today_costs
+        roi = (profit / today_costs) * 100 if today_costs > 0 else 0
+        
+        # Log data to the result sink, writing it out after the last day
+        if self.sink is not None:
+            with self.profiler.phase("log_results"):
+                self.log_to_csv(day, self.store.inventory, demand, fulfilled, demand - fulfilled, order_quantity, 
+                                supplier_name, daily_holding_cost, daily_stockout_cost, order_cost, revenue, profit, roi)
+        self.next_day = day + 1
+        if self.next_day == self.n_days:
+            self.finish()
 
     def receive_pending_orders(self):
-        new_pending_orders = []
-        for arrival_day, quantity, supplier_name in self.pending_orders:
-            if self.env.now >= arrival_day:
-                self.store.receive_order(quantity, supplier_name)
-                print(f"Day {self.env.now}: Order of {quantity} units received from {supplier_name}. New Inventory = {self.store.inventory}", end=" ")
-            else:
-                new_pending_orders.append((arrival_day, quantity, supplier_name))
-        self.pending_orders = new_pending_orders
+        for arrival_day, quantity, supplier_name in self.pending_orders.pop_due(self.env.now):
+            self.store.receive_order(quantity, supplier_name)
+            self.event_log.record(self.env.now, ORDER_RECEIVED, quantity=quantity, supplier=supplier_name,
+                                  inventory=self.store.inventory)
 
     def log_to_csv(self, day, inventory, demand, fulfilled, stockouts, order_quantity, supplier_name, 
-                   holding_cost, stockout_cost, revenue, profit, roi):
-        """Logs the day's data to a CSV file for graphing later."""
-        with open(self.csv_filename, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([day, inventory, demand, fulfilled, stockouts, order_quantity, supplier_name,
-                             f"{holding_cost:.2f}", f"{stockout_cost:.2f}", f"{revenue:.2f}", 
-                             f"{profit:.2f}", f"{roi:.2f}"])
+                   holding_cost, stockout_cost, supplier_cost, revenue, profit, roi):
+        """Buffers the day's data in the result sink for graphing later."""
+        self.sink.append(day, inventory, demand, fulfilled, stockouts, order_quantity, supplier_name,
+                         holding_cost, stockout_cost, supplier_cost, revenue, profit, roi)
+
+    def finish(self):
+        """Writes out the result sink and records the end-of-run summary, after the last day."""
+        if self.sink is not None:
+            self.sink.close()
+        self.record_summary()
 
-    def compute_final_roi(self):
-        """Calculates and prints final ROI metrics."""
+    def record_summary(self):
+        """Records the final financial totals as a RUN_SUMMARY event."""
         profit = self.total_revenue - self.total_costs
         roi = (profit / self.total_costs) * 100 if self.total_costs > 0 else 0
-        
-        print("\n=== Fixed Order Model Financial Summary ===")
-        print(f"Total Revenue: ${self.total_revenue:.2f}")
-        print(f"Total Supplier Cost: ${self.total_supplier_cost:.2f}")
-        print(f"Total Holding Cost: ${self.total_holding_costs:.2f}")
-        print(f"Total Stockout Cost: ${self.total_stockout_costs:.2f}")
-        print(f"Total Costs: ${self.total_costs:.2f}")
-        print(f"ROI: {roi:.2f}%")
-        
-        print("\n=== FINAL SIMULATION RESULTS ===")
-        print(f"Total Revenue: ${self.total_revenue:.2f}")
-        print(f"Total Costs: ${self.total_costs:.2f}")
-        print(f"Profit: ${profit:.2f}")
-        print(f"Final ROI: {roi:.2f}%")
+        self.event_log.record(self.next_day - 1, RUN_SUMMARY, model="Fixed Order Model",
+                              total_revenue=self.total_revenue, total_supplier_cost=self.total_supplier_cost,
+                              total_holding_cost=self.total_holding_costs,
+                              total_stockout_cost=self.total_stockout_costs, total_costs=self.total_costs,
+                              profit=profit, roi=roi)
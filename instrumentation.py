@@ -0,0 +1,152 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# --------------------------
+# Instrumentation Settings
+# --------------------------
+PROFILE_TOP_N = 30  # Hot spots written by profile_call
+PROFILE_SORT = "cumulative"  # pstats sort key for profile_call
+
+_DISABLED_PHASE = nullcontext()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._enter(self.name)
+
+    def __exit__(self, *exc_info):
+        self.profiler._exit()
+        return False
+
+
+class Profiler:
+    """
+    Opt-in per-phase timing for simulation runs.
+
+    Code marks phases with `with profiler.phase("name"):`. An enabled profiler records
+    wall time, call counts and, with track_allocations=True, net bytes allocated per
+    phase (via tracemalloc). Phases may nest. A phase's self time excludes the phases
+    nested inside it. A disabled profiler returns one shared no-op context, so
+    instrumented code costs almost nothing when profiling is off.
+
+    Both policies take one as profiler. FixedOrderSupplyChain times fulfill_demand,
+    receive_orders, reorder, log_results and skip_quiet_days; OptimizedMLSupplyChain
+    times fulfill_demand, receive_orders, ml_fit, ml_predict, event_scan and
+    skip_quiet_days. simulation_runner.simulate wraps the whole run in "simulate".
+
+    Parameters:
+        enabled (bool): Whether phases are recorded.
+        track_allocations (bool): Also trace allocations. This slows runs noticeably.
+    """
+
+    def __init__(self, enabled=True, track_allocations=False):
+        self.enabled = enabled
+        self.track_allocations = enabled and track_allocations
+        self.stats = {}
+        self._phases = {}
+        self._stack = []
+        self._started_tracing = False
+        self.started_at = None
+        self.stopped_at = None
+        self.peak_traced_bytes = None
+
+    def start(self):
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.started_at = time.perf_counter()
+        return self
+
+    def stop(self):
+        self.stopped_at = time.perf_counter()
+        self.peak_traced_bytes = tracemalloc.get_traced_memory()[1] if self.track_allocations else None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def phase(self, name):
+        """Context manager timing one call of the named phase."""
+        if not self.enabled:
+            return _DISABLED_PHASE
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def _enter(self, name):
+        allocated = tracemalloc.get_traced_memory()[0] if self.track_allocations else 0
+        self._stack.append([name, time.perf_counter(), 0.0, allocated])
+
+    def _exit(self):
+        name, started, nested, allocated = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = {"calls": 0, "total_seconds": 0.0, "self_seconds": 0.0, "allocated_bytes": 0}
+        stats["calls"] += 1
+        stats["total_seconds"] += elapsed
+        stats["self_seconds"] += elapsed - nested
+        if self.track_allocations:
+            stats["allocated_bytes"] += tracemalloc.get_traced_memory()[0] - allocated
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def summary(self):
+        """Returns the recorded phases, slowest first, as a JSON-serializable dict."""
+        end = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+        phases = {}
+        for name, stats in sorted(self.stats.items(), key=lambda item: -item[1]["total_seconds"]):
+            phases[name] = dict(stats, mean_seconds=stats["total_seconds"] / stats["calls"])
+            if not self.track_allocations:
+                del phases[name]["allocated_bytes"]
+        summary = {
+            "wall_seconds": end - self.started_at if self.started_at is not None else None,
+            "phases": phases,
+        }
+        if self.track_allocations:
+            peak = self.peak_traced_bytes
+            summary["peak_traced_bytes"] = peak if peak is not None else tracemalloc.get_traced_memory()[1]
+        return summary
+
+    def write_summary(self, path):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+NULL_PROFILER = Profiler(enabled=False)
+
+
+def profile_call(func, *args, path=None, top_n=PROFILE_TOP_N, sort=PROFILE_SORT, **kwargs):
+    """
+    Runs func(*args, **kwargs) under cProfile and returns its result. The top_n hot
+    spots, sorted by sort, are written to path as text (or printed if path is None).
+    """
+    profile = cProfile.Profile()
+    result = profile.runcall(func, *args, **kwargs)
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).sort_stats(sort).print_stats(top_n)
+    if path is None:
+        print(output.getvalue())
+    else:
+        with open(path, "w") as file:
+            file.write(output.getvalue())
+    return result
@@ -0,0 +1,194 @@
+import numpy as np
+from data_generator import DataGenerator
+from Store import INITIAL_INVENTORY, MAX_STORAGE_CAPACITY
+from fixed_order_supply_chain import (REORDER_POINT, ORDER_QUANTITY, SELLING_PRICE_PER_UNIT,
+                                      HOLDING_COST_PER_UNIT, STOCKOUT_PENALTY_PER_UNIT)
+from replication_engine import DEFAULT_GENERATOR_PARAMS
+from simulation_runner import build_suppliers
+
+# --------------------------
+# Network Parameters
+# --------------------------
+NETWORK_DAYS = 365
+DEMAND_BLOCK_ELEMENTS = 4_000_000  # Demand values generated per block; bounds the generator's temporary arrays
+DEFAULT_SUPPLIER = "Normal"
+
+
+class NetworkResult:
+    """
+    Per store-SKU totals of a network run, kept as (n_stores, n_skus) arrays, plus
+    per-supplier order statistics.
+    """
+
+    def __init__(self, n_stores, n_skus, columns, supplier_stats):
+        self.n_stores = n_stores
+        self.n_skus = n_skus
+        self.columns = {name: values.reshape(n_stores, n_skus) for name, values in columns.items()}
+        self.supplier_stats = supplier_stats
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def totals(self):
+        """Network-wide totals with the same fields as simulation_runner.summarize."""
+        totals = {name: values.sum().item() for name, values in self.columns.items()}
+        totals["roi"] = (totals["profit"] / totals["total_costs"]) * 100 if totals["total_costs"] > 0 else 0
+        return totals
+
+    def by_store(self, name):
+        return self.columns[name].sum(axis=1)
+
+    def by_sku(self, name):
+        return self.columns[name].sum(axis=0)
+
+
+class NetworkSimulation:
+    """
+    Simulates the fixed (s, Q) policy for every store-SKU pair of a network at once.
+
+    Each store-SKU pair (a node) follows the same daily step as FixedOrderSupplyChain:
+    fulfill demand, receive due orders (capped at MAX_STORAGE_CAPACITY), then order Q
+    units when inventory is below s and nothing is pending. Node state is held as one
+    flat array per field (structure of arrays) and every step works on all nodes at once.
+
+    Suppliers are shared by all nodes. A supplier with a finite daily capacity accepts
+    requests until that many units are ordered from it in a day; the rest are turned
+    down and those nodes ask again the next day. Requests are served from a random
+    starting node each day so no store is always first in line.
+
+    Parameters:
+        n_stores (int): Number of stores.
+        n_skus (int): Number of SKUs stocked by every store.
+        suppliers (list, optional): Supplier objects; defaults to build_suppliers(seed).
+        supplier_assignment (str or array): Supplier name per node, broadcastable to (n_stores, n_skus).
+        supplier_capacity (dict, optional): Units per day each supplier name can accept; unlisted suppliers are unlimited.
+        reorder_point, order_quantity (int or array): (s, Q) per node, broadcastable to (n_stores, n_skus).
+        sim_days (int): Days to simulate.
+        generator_params (dict, optional): DataGenerator parameters, on top of DEFAULT_GENERATOR_PARAMS.
+        seed (int, optional): Seeds demand, suppliers and the daily allocation order.
+    """
+
+    def __init__(self, n_stores, n_skus, suppliers=None, supplier_assignment=DEFAULT_SUPPLIER, supplier_capacity=None,
+                 reorder_point=REORDER_POINT, order_quantity=ORDER_QUANTITY, sim_days=NETWORK_DAYS,
+                 generator_params=None, seed=None):
+        demand_seed, supplier_seed, allocation_seed = np.random.SeedSequence(seed).spawn(3)
+        self.n_stores = n_stores
+        self.n_skus = n_skus
+        self.n_nodes = n_stores * n_skus
+        self.sim_days = sim_days
+        self.suppliers = suppliers if suppliers is not None else build_suppliers(supplier_seed)
+        self.generator = DataGenerator(sim_days=sim_days, seed=demand_seed,
+                                       **dict(DEFAULT_GENERATOR_PARAMS, **(generator_params or {})))
+        self.rng = np.random.default_rng(allocation_seed)
+
+        names = [supplier.name for supplier in self.suppliers]
+        assignment = self._per_node(supplier_assignment, dtype=object)
+        unknown = set(assignment.tolist()) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown supplier(s) in supplier_assignment: {sorted(unknown)}")
+        self.supplier_index = np.empty(self.n_nodes, dtype=np.int8)
+        for index, name in enumerate(names):
+            self.supplier_index[assignment == name] = index
+        capacity = supplier_capacity or {}
+        self.capacity = [capacity.get(name, np.inf) for name in names]
+
+        self.reorder_point = self._per_node(reorder_point, dtype=np.int32)
+        self.order_quantity = self._per_node(order_quantity, dtype=np.int32)
+
+        self.inventory = np.full(self.n_nodes, INITIAL_INVENTORY, dtype=np.int32)
+        self.arrival_day = np.full(self.n_nodes, -1, dtype=np.int32)  # -1 means no order pending
+        self.units_sold = np.zeros(self.n_nodes, dtype=np.int64)
+        self.units_held = np.zeros(self.n_nodes, dtype=np.int64)  # Sum of end-of-day inventory, for holding costs
+        self.stockouts = np.zeros(self.n_nodes, dtype=np.int64)
+        self.orders_placed = np.zeros(self.n_nodes, dtype=np.int32)
+        self.orders_received = np.zeros(self.n_nodes, dtype=np.int32)
+        self.supplier_cost = np.zeros(self.n_nodes)
+        self.supplier_stats = {name: {"orders": 0, "units": 0, "rejected": 0, "cost": 0.0} for name in names}
+
+    def _per_node(self, value, dtype):
+        return np.broadcast_to(np.asarray(value, dtype=dtype), (self.n_stores, self.n_skus)).ravel().copy()
+
+    def run(self):
+        block_days = max(1, DEMAND_BLOCK_ELEMENTS // self.n_nodes)
+        for start in range(0, self.sim_days, block_days):
+            n_days = min(block_days, self.sim_days - start)
+            # Day-major copy, so each day's demand is one contiguous row
+            demand = np.ascontiguousarray(self.generator.generate_demand_block(start, n_days, self.n_nodes).T,
+                                          dtype=np.int32)
+            for offset in range(n_days):
+                self.step(start + offset, demand[offset])
+        return self.result()
+
+    def step(self, day, demand):
+        fulfilled = np.minimum(self.inventory, demand)
+        self.inventory -= fulfilled
+        self.units_sold += fulfilled
+        self.stockouts += demand - fulfilled
+        self.units_held += self.inventory
+
+        arriving = np.flatnonzero((self.arrival_day >= 0) & (self.arrival_day <= day))
+        if len(arriving):
+            self.inventory[arriving] = np.minimum(self.inventory[arriving] + self.order_quantity[arriving],
+                                                  MAX_STORAGE_CAPACITY)
+            self.arrival_day[arriving] = -1
+            self.orders_received[arriving] += 1
+
+        requesting = np.flatnonzero((self.inventory < self.reorder_point) & (self.arrival_day < 0))
+        if len(requesting):
+            self.place_orders(day, requesting)
+
+    #Allocates the day's requests to suppliers within their capacity and books the accepted orders.
+    def place_orders(self, day, requesting):
+        requesting = np.roll(requesting, -int(self.rng.integers(len(requesting))))
+        requested_from = self.supplier_index[requesting]
+        for index, supplier in enumerate(self.suppliers):
+            nodes = requesting[requested_from == index]
+            if not len(nodes):
+                continue
+            quantities = self.order_quantity[nodes]
+            stats = self.supplier_stats[supplier.name]
+            if np.isfinite(self.capacity[index]):
+                accepted = np.cumsum(quantities, dtype=np.int64) <= self.capacity[index]
+                stats["rejected"] += len(nodes) - int(accepted.sum())
+                nodes, quantities = nodes[accepted], quantities[accepted]
+                if not len(nodes):
+                    continue
+
+            costs = supplier.get_costs(quantities)
+            self.arrival_day[nodes] = day + supplier.sample_delivery_times(len(nodes))
+            self.orders_placed[nodes] += 1
+            self.supplier_cost[nodes] += costs
+            stats["orders"] += len(nodes)
+            stats["units"] += int(quantities.sum())
+            stats["cost"] += float(costs.sum())
+
+    def result(self):
+        revenue = self.units_sold * SELLING_PRICE_PER_UNIT
+        holding_costs = self.units_held * HOLDING_COST_PER_UNIT
+        stockout_costs = self.stockouts * STOCKOUT_PENALTY_PER_UNIT
+        total_costs = self.supplier_cost + holding_costs + stockout_costs
+        columns = {
+            "total_revenue": revenue.astype(np.float64),
+            "total_costs": total_costs,
+            "profit": revenue - total_costs,
+            "stockouts": self.stockouts,
+            "orders_placed": self.orders_received.astype(np.int64),
+            "final_inventory": self.inventory.astype(np.int64),
+            "total_supplier_cost": self.supplier_cost,
+            "total_holding_costs": holding_costs,
+            "total_stockout_costs": stockout_costs,
+        }
+        return NetworkResult(self.n_stores, self.n_skus, columns, self.supplier_stats)
+
+
+if __name__ == "__main__":
+    network = NetworkSimulation(n_stores=500, n_skus=200, supplier_capacity={"Normal": 200_000}, seed=1)
+    totals = network.run().totals()
+    print(f"=== Network of {network.n_stores} stores x {network.n_skus} SKUs over {network.sim_days} days ===")
+    print(f"Total Revenue: ${totals['total_revenue']:.2f}")
+    print(f"Total Costs: ${totals['total_costs']:.2f}")
+    print(f"Profit: ${totals['profit']:.2f}")
+    print(f"ROI: {totals['roi']:.2f}%")
+    print(f"Stockouts: {totals['stockouts']}")
+    for name, stats in network.supplier_stats.items():
+        print(f"{name}: {stats['orders']} orders, {stats['units']} units, {stats['rejected']} requests turned down")
@@ -1,7 +1,14 @@
+from collections import deque
+from itertools import islice
 import numpy as np
 import simpy
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
+from demand_stream import DemandStream, daily_demand, demand_length
+from event_log import SILENT_LOG, DAY, ORDER_PLACED, EMERGENCY_ORDER, ORDER_RECEIVED, RUN_SUMMARY
+from instrumentation import NULL_PROFILER
+from event_driven import prefix_sums, total_before, held_units
+from order_book import OrderBook
+from rolling_stats import RollingWindow
+from Store import HOLDING_COST_PER_UNIT, STOCKOUT_PENALTY_PER_UNIT, SELLING_PRICE_PER_UNIT
 
 MISSED_REVENUE_THRESHOLD = 5000  
 PENALTY_MULTIPLIER = 150  
@@ -9,6 +16,13 @@ ORDER_SCALING_FACTOR = 1.2
 SAFETY_STOCK_MULTIPLIER = 6  
 EMERGENCY_ORDER_THRESHOLD = 0.2  
 EMERGENCY_ORDER_SIZE = 50  
+MIN_TRAINING_SAMPLES = 10  # Orders observed before the model is used to pick suppliers
+EVENT_SCAN_DAYS = 32  # Initial look-ahead when searching for the next order decision in event-driven runs
+
+#Builds the supplier delay model. scikit-learn is imported here, on first use, so importing this module stays cheap.
+def build_delay_model():
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(n_estimators=10)
 
 class OptimizedMLSupplyChain:
     """
@@ -17,91 +31,265 @@ class OptimizedMLSupplyChain:
     Uses emergency orders for critical stockouts and adjusts order sizes based on demand patterns.
     """
 
-    def __init__(self, env, store, suppliers, demand_data, lookback=5):
+    def __init__(self, env, store, suppliers, demand_data, lookback=5, refit_every=1, demand_bucket=None,
+                 demand_feature="mean", safety_std_factor=0, event_driven=False, profiler=None,
+                 event_log=None, max_training_samples=None):
+        if event_driven and demand_feature != "mean":
+            raise ValueError("event_driven runs require demand_feature='mean'")
+        if event_driven and isinstance(demand_data, DemandStream):
+            raise ValueError("event_driven runs need demand_data as a list or array, not a DemandStream")
+        if max_training_samples is not None and max_training_samples <= MIN_TRAINING_SAMPLES:
+            raise ValueError(f"max_training_samples must exceed MIN_TRAINING_SAMPLES ({MIN_TRAINING_SAMPLES}), "
+                             "or the delay model is never trained")
         self.env = env
         self.store = store
         self.suppliers = suppliers
         self.demand_data = demand_data
+        self.n_days = demand_length(demand_data)
+        self.event_driven = event_driven
         self.lookback = lookback
-        self.training_data = []
-        self.ml_model = RandomForestRegressor(n_estimators=10)
-        self.pending_orders = []
+        self.demand_window = RollingWindow(lookback)
+        self.demand_feature = demand_feature
+        self.safety_std_factor = safety_std_factor
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.event_log = event_log if event_log is not None else SILENT_LOG
+        self.training_data = deque(maxlen=max_training_samples)
+        self.samples_seen = 0
+        self.ml_model = None  # Built by refit_model on the first fit
+        self.refit_every = refit_every
+        self.demand_bucket = demand_bucket
+        self.samples_at_last_fit = None
+        self.prediction_cache = {}
+        self.pending_orders = OrderBook()
         self.last_order_day = -10
         self.missed_revenue = 0  
-        self.env.process(self.run())
 
-        self.emergency_supplier = next(s for s in self.suppliers if s.name == "Expedited")
+        self.total_supplier_cost = 0
+        self.total_holding_costs = 0
+        self.total_stockout_costs = 0
+        self.total_revenue = 0
+        self.next_day = 0
+
+        self.emergency_supplier = next((s for s in self.suppliers if s.name == "Expedited"), None)
+        if self.emergency_supplier is None:
+            raise ValueError("suppliers must include the 'Expedited' emergency supplier")
+
+        # Static per-supplier model features and base costs of the regular (non-emergency) candidates
+        self.candidate_suppliers = [s for s in self.suppliers if s.name != "Expedited"]
+        if not self.candidate_suppliers:
+            raise ValueError("suppliers must include at least one regular supplier besides 'Expedited'")
+        self.candidate_features = np.array([[s.reliability, s.cost_multiplier, np.mean(s.delivery_time_range)]
+                                            for s in self.candidate_suppliers])
+        self.candidate_base_costs = np.array([s.get_cost(100) + s.shipping_cost for s in self.candidate_suppliers])
+
+        self.env.process(self.run_event_driven() if event_driven else self.run())
+
+    def run(self, start_day=0):
+        for day, demand in enumerate(islice(daily_demand(self.demand_data), start_day, None), start_day):
+            self.step(day, demand)
+            yield self.env.timeout(1)
+
+        # Streams of unknown length only end here; known lengths finish in step()
+        if self.n_days is None:
+            self.record_summary()
+
+    def run_event_driven(self, start_day=0):
+        n_days = self.n_days
+        self.demand_array = np.array(self.demand_data, dtype=np.int64)
+        # Rolling windows that reach back before start_day cover the demand this run actually
+        # saw, which differs from demand_data when a snapshot is restored with new demand
+        seen = self.demand_window.to_list()
+        self.demand_array[start_day - len(seen):start_day] = seen
+        self.cumulative_demand, self.cumulative_demand_sums = prefix_sums(self.demand_array)
+        self.cumulative_squares = np.cumsum(self.demand_array * self.demand_array)
+
+        day = start_day
+        while day < n_days:
+            with self.profiler.phase("event_scan"):
+                event_day = self.next_event_day(day, n_days)
+            if event_day > day:
+                with self.profiler.phase("skip_quiet_days"):
+                    self.skip_quiet_days(day, event_day)
+                yield self.env.timeout(event_day - day)
+                day = event_day
+            if day < n_days:
+                self.step(day)
+                yield self.env.timeout(1)
+                day += 1
+
+    def next_event_day(self, day, n_days):
+        """Next day on which an order arrives or an emergency or regular order would be placed."""
+        arrival_day = self.pending_orders.next_arrival_day()
+        if arrival_day is not None:
+            return min(max(arrival_day, day), n_days)
+
+        start, span = day, EVENT_SCAN_DAYS
+        while start < n_days:
+            end = min(start + span, n_days)
+            triggered = np.flatnonzero(self.order_due(day, start, end))
+            if len(triggered):
+                return start + int(triggered[0])
+            start, span = end, span * 2
+        return n_days
+
+    def order_due(self, day, start, end):
+        """
+        For each day in [start, end), whether an order would be placed that day if nothing
+        arrives or is ordered from the start of `day` on. Mirrors the checks in step.
+        """
+        days = np.arange(start, end)
+        window_start = days - self.lookback + 1
+        window_full = window_start >= 0
+        window_start = np.maximum(window_start, 0)
+        before_window = np.where(window_start > 0, self.cumulative_demand[window_start - 1], 0)
+
+        avg_demand = (self.cumulative_demand[days] - before_window) / self.lookback
+        first_demand = self.demand_window.first if self.demand_window.first is not None else self.demand_array[0]
+        depletion_rate = (self.demand_array[days] - first_demand) / self.lookback
+        reorder_threshold = avg_demand * SAFETY_STOCK_MULTIPLIER + depletion_rate * 3
+        if self.safety_std_factor:
+            squares_before = np.where(window_start > 0, self.cumulative_squares[window_start - 1], 0)
+            variance = (self.cumulative_squares[days] - squares_before) / self.lookback - avg_demand * avg_demand
+            reorder_threshold += self.safety_std_factor * np.sqrt(np.maximum(variance, 0.0))
+
+        demand_since = self.cumulative_demand[days] - total_before(self.cumulative_demand, day)
+        inventory = np.maximum(self.store.inventory - demand_since, 0)
+        emergency = inventory < (reorder_threshold * EMERGENCY_ORDER_THRESHOLD)
+        regular = (inventory < reorder_threshold) & ((days - self.last_order_day) > 7)
+        return window_full & (emergency | regular)
 
-    def run(self):
-        for day in range(len(self.demand_data)):
-            print(f"Day {day}: Inventory = {self.store.inventory}", end=" ")
+    def skip_quiet_days(self, start, end):
+        """Accounts for days [start, end), on which no order arrives or is placed, in closed form."""
+        demand = self.demand_array[start:end]
+        inventory = self.store.inventory
+        held = held_units(self.cumulative_demand, self.cumulative_demand_sums, start, end, inventory)
+        fulfilled = self.store.fulfill_demand_series(demand)
+        missed = int(demand.sum()) - fulfilled
+        self.demand_window.extend(demand)
 
+        self.missed_revenue += missed * 50
+        self.total_holding_costs += held * HOLDING_COST_PER_UNIT
+        self.total_stockout_costs += missed * STOCKOUT_PENALTY_PER_UNIT
+        self.total_revenue += fulfilled * SELLING_PRICE_PER_UNIT
+        self.next_day = end
+        if end == self.n_days:
+            self.record_summary()
+
+    def step(self, day, demand=None):
+        """Simulates one day: fulfill demand, receive orders and place emergency or regular orders."""
+        opening_inventory = self.store.inventory
+        if demand is None:
             demand = self.demand_data[day]
+        with self.profiler.phase("fulfill_demand"):
             fulfilled = self.store.fulfill_demand(demand)
-            missed = demand - fulfilled
-            print(f"| Demand: {demand}, Fulfilled: {fulfilled}", end=" ")
+        missed = demand - fulfilled
+        self.demand_window.push(int(demand))
+        self.event_log.record(day, DAY, inventory=opening_inventory, demand=demand, fulfilled=fulfilled)
+
+        self.missed_revenue += missed * 50  
 
-            self.missed_revenue += missed * 50  
+        self.total_holding_costs += self.store.inventory * HOLDING_COST_PER_UNIT
+        self.total_stockout_costs += missed * STOCKOUT_PENALTY_PER_UNIT
+        self.total_revenue += fulfilled * SELLING_PRICE_PER_UNIT
 
+        with self.profiler.phase("receive_orders"):
             self.receive_pending_orders()
 
-            self.store.demand_history = [int(x) for x in self.store.demand_history]
-            if len(self.store.demand_history) >= self.lookback:
-                avg_demand = sum(self.store.demand_history[-self.lookback:]) / self.lookback
-                depletion_rate = (self.store.demand_history[-1] - self.store.demand_history[0]) / self.lookback
-                reorder_threshold = avg_demand * SAFETY_STOCK_MULTIPLIER + depletion_rate * 3  
-
-                if self.store.inventory < (reorder_threshold * EMERGENCY_ORDER_THRESHOLD) and len(self.pending_orders) == 0:
-                    emergency_order_cost = self.emergency_supplier.get_cost(EMERGENCY_ORDER_SIZE) + self.emergency_supplier.shipping_cost
-                    self.pending_orders.append((self.env.now + self.emergency_supplier.get_delivery_time(), EMERGENCY_ORDER_SIZE, self.emergency_supplier))
-                    print(f"| Emergency Order Placed: {EMERGENCY_ORDER_SIZE} units from {self.emergency_supplier.name} (Delivery in 1-2 days)", end=" ")
-
-                if self.store.inventory < reorder_threshold and (day - self.last_order_day) > 7 and len(self.pending_orders) == 0:
-                    
-                    if len(self.training_data) > 10:
-                        df = pd.DataFrame(self.training_data, columns=['AvgDemand', 'Reliability', 'CostMultiplier', 'DeliveryTime', 'Delay'])
-                        X = df[['AvgDemand', 'Reliability', 'CostMultiplier', 'DeliveryTime']]
-                        y = df['Delay']
-                        self.ml_model.fit(X, y)
-
-                        supplier_scores = {}
-                        for supplier in self.suppliers:
-                            if supplier.name == "Expedited":
-                                continue  
-                            X_pred = pd.DataFrame([[avg_demand, supplier.reliability, supplier.cost_multiplier, np.mean(supplier.delivery_time_range)]], 
-                                                  columns=['AvgDemand', 'Reliability', 'CostMultiplier', 'DeliveryTime'])
-                            predicted_delay = self.ml_model.predict(X_pred)[0]
-                            total_cost = (supplier.get_cost(100) + supplier.shipping_cost + (predicted_delay ** 2) * PENALTY_MULTIPLIER)
-                            supplier_scores[supplier.name] = total_cost
-
-                        best_supplier_name = min(supplier_scores, key=supplier_scores.get)
-                        supplier = next(s for s in self.suppliers if s.name == best_supplier_name)
-                    else:
-                        supplier = min((s for s in self.suppliers if s.name != "Expedited"), key=lambda s: min(s.delivery_time_range))
-
-                    order_quantity = max(int(avg_demand * 5), 100)
-                    if self.missed_revenue > MISSED_REVENUE_THRESHOLD:
-                        order_quantity = int(order_quantity * ORDER_SCALING_FACTOR)
-
-                    delivery_time = supplier.get_delivery_time()
-                    order_cost = supplier.get_cost(order_quantity) + supplier.shipping_cost
-                    self.pending_orders.append((self.env.now + delivery_time, order_quantity, supplier))
-
-                    print(f"| Order Placed: {order_quantity} units from {supplier.name} (Delivery in {delivery_time} days)", end=" ")
-                    self.last_order_day = day  
-
-                    self.training_data.append([avg_demand, supplier.reliability, supplier.cost_multiplier, np.mean(supplier.delivery_time_range), delivery_time])
-
-            print()
-            yield self.env.timeout(1)
+        if self.demand_window.full:
+            avg_demand = self.demand_window.mean
+            reorder_threshold = self.compute_reorder_threshold(avg_demand)
+
+            if self.store.inventory < (reorder_threshold * EMERGENCY_ORDER_THRESHOLD) and len(self.pending_orders) == 0:
+                emergency_order_cost = self.emergency_supplier.get_cost(EMERGENCY_ORDER_SIZE) + self.emergency_supplier.shipping_cost
+                self.total_supplier_cost += emergency_order_cost
+                delivery_time = self.emergency_supplier.get_delivery_time()
+                self.pending_orders.add(self.env.now + delivery_time, EMERGENCY_ORDER_SIZE, self.emergency_supplier)
+                self.event_log.record(day, EMERGENCY_ORDER, quantity=EMERGENCY_ORDER_SIZE,
+                                      supplier=self.emergency_supplier.name, delivery_time=delivery_time)
+
+            if self.store.inventory < reorder_threshold and (day - self.last_order_day) > 7 and len(self.pending_orders) == 0:
+                
+                if len(self.training_data) > MIN_TRAINING_SAMPLES:
+                    self.refit_model()
+                    predicted_delays = self.predict_delays(avg_demand)
+                    supplier_scores = self.candidate_base_costs + (predicted_delays ** 2) * PENALTY_MULTIPLIER
+                    supplier = self.candidate_suppliers[int(np.argmin(supplier_scores))]
+                else:
+                    supplier = min(self.candidate_suppliers, key=lambda s: min(s.delivery_time_range))
+
+                order_quantity = max(int(avg_demand * 5), 100)
+                if self.missed_revenue > MISSED_REVENUE_THRESHOLD:
+                    order_quantity = int(order_quantity * ORDER_SCALING_FACTOR)
+
+                delivery_time = supplier.get_delivery_time()
+                order_cost = supplier.get_cost(order_quantity) + supplier.shipping_cost
+                self.total_supplier_cost += order_cost
+                self.pending_orders.add(self.env.now + delivery_time, order_quantity, supplier)
+
+                self.event_log.record(day, ORDER_PLACED, quantity=order_quantity, supplier=supplier.name,
+                                      delivery_time=delivery_time)
+                self.last_order_day = day  
+
+                self.training_data.append([avg_demand, supplier.reliability, supplier.cost_multiplier, np.mean(supplier.delivery_time_range), delivery_time])
+                self.samples_seen += 1
+
+        self.next_day = day + 1
+        if self.next_day == self.n_days:
+            self.record_summary()
+
+    def compute_reorder_threshold(self, avg_demand):
+        """
+        Inventory level below which a regular order is placed: a multiple of the rolling
+        window mean (or of its EWMA when demand_feature="ewma"), adjusted for depletion,
+        plus safety_std_factor rolling standard deviations of safety stock.
+        """
+        demand_level = self.demand_window.ewma if self.demand_feature == "ewma" else avg_demand
+        reorder_threshold = demand_level * SAFETY_STOCK_MULTIPLIER + self.demand_window.depletion_rate * 3
+        if self.safety_std_factor:
+            reorder_threshold += self.safety_std_factor * self.demand_window.std
+        return reorder_threshold
+
+    def refit_model(self):
+        """Refits the delay model once refit_every new observations have arrived."""
+        n_samples = self.samples_seen
+        if self.samples_at_last_fit is not None and n_samples - self.samples_at_last_fit < self.refit_every:
+            return
+        data = np.asarray(self.training_data, dtype=float)
+        if self.ml_model is None:
+            self.ml_model = build_delay_model()
+        with self.profiler.phase("ml_fit"):
+            self.ml_model.fit(data[:, :4], data[:, 4])
+        self.samples_at_last_fit = n_samples
+        self.prediction_cache.clear()
+
+    def predict_delays(self, avg_demand):
+        """
+        Predicts the delays of all candidate suppliers in one batched call, cached per
+        average-demand bucket (of width demand_bucket, exact if None) until the next refit.
+        """
+        if self.demand_bucket:
+            avg_demand = round(avg_demand / self.demand_bucket) * self.demand_bucket
+        predicted_delays = self.prediction_cache.get(avg_demand)
+        if predicted_delays is None:
+            X = np.column_stack([np.full(len(self.candidate_suppliers), avg_demand), self.candidate_features])
+            with self.profiler.phase("ml_predict"):
+                predicted_delays = self.ml_model.predict(X)
+            self.prediction_cache[avg_demand] = predicted_delays
+        return predicted_delays
+
+    def record_summary(self):
+        """Records the final financial totals as a RUN_SUMMARY event, after the last day."""
+        total_costs = self.total_supplier_cost + self.total_holding_costs + self.total_stockout_costs
+        profit = self.total_revenue - total_costs
+        roi = (profit / total_costs) * 100 if total_costs > 0 else 0
+        self.event_log.record(self.next_day - 1, RUN_SUMMARY, model="Optimized ML Model",
+                              total_revenue=self.total_revenue, total_supplier_cost=self.total_supplier_cost,
+                              total_holding_cost=self.total_holding_costs,
+                              total_stockout_cost=self.total_stockout_costs, total_costs=total_costs,
+                              profit=profit, roi=roi)
 
     def receive_pending_orders(self):
-        new_pending_orders = []
-        for arrival_day, quantity, supplier in self.pending_orders:
-            if self.env.now >= arrival_day:
-                self.store.receive_order(quantity, supplier.name)
-                print(f"| Order of {quantity} units received from {supplier.name}. New Inventory = {self.store.inventory}", end=" ")
-            else:
-                new_pending_orders.append((arrival_day, quantity, supplier))
-
-        self.pending_orders = new_pending_orders
\ No newline at end of file
+        for arrival_day, quantity, supplier in self.pending_orders.pop_due(self.env.now):
+            self.store.receive_order(quantity, supplier.name)
+            self.event_log.record(self.env.now, ORDER_RECEIVED, quantity=quantity, supplier=supplier.name,
+                                  inventory=self.store.inventory)
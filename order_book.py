@@ -0,0 +1,62 @@
+import heapq
+
+
+class OrderBook:
+    """
+    Outstanding orders kept in a min-heap keyed on arrival day.
+
+    Adding an order and popping the orders due on a given day cost O(log n) each,
+    and the on-order quantity and order count, in total and per supplier, are kept
+    as running aggregates so inventory-position rules can read them in O(1).
+    Orders due on the same day are returned in the order they were placed.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.sequence = 0
+        self.on_order = 0
+        self.on_order_by_supplier = {}
+        self.count_by_supplier = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        """Iterates (arrival_day, quantity, supplier) in arrival order."""
+        for arrival_day, _, quantity, supplier in sorted(self.heap):
+            yield arrival_day, quantity, supplier
+
+    @staticmethod
+    def supplier_key(supplier):
+        return getattr(supplier, "name", supplier)
+
+    def add(self, arrival_day, quantity, supplier):
+        """Records an order of quantity units from supplier arriving on arrival_day."""
+        heapq.heappush(self.heap, (arrival_day, self.sequence, quantity, supplier))
+        self.sequence += 1
+        key = self.supplier_key(supplier)
+        self.on_order += quantity
+        self.on_order_by_supplier[key] = self.on_order_by_supplier.get(key, 0) + quantity
+        self.count_by_supplier[key] = self.count_by_supplier.get(key, 0) + 1
+
+    def pop_due(self, day):
+        """Removes and returns the (arrival_day, quantity, supplier) orders arriving on or before day."""
+        due = []
+        while self.heap and self.heap[0][0] <= day:
+            arrival_day, _, quantity, supplier = heapq.heappop(self.heap)
+            key = self.supplier_key(supplier)
+            self.on_order -= quantity
+            self.on_order_by_supplier[key] -= quantity
+            self.count_by_supplier[key] -= 1
+            due.append((arrival_day, quantity, supplier))
+        return due
+
+    def next_arrival_day(self):
+        """Arrival day of the earliest outstanding order, or None if nothing is pending."""
+        return self.heap[0][0] if self.heap else None
+
+    def on_order_from(self, supplier):
+        return self.on_order_by_supplier.get(self.supplier_key(supplier), 0)
+
+    def count_from(self, supplier):
+        return self.count_by_supplier.get(self.supplier_key(supplier), 0)
@@ -0,0 +1,259 @@
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from statistics import NormalDist
+import numpy as np
+import simpy
+import sim_code
+from data_generator import DataGenerator
+from fast_fixed_order import draw_lead_times
+from fixed_order_supply_chain import FixedOrderSupplyChain
+from replication_engine import confidence_interval, DEFAULT_GENERATOR_PARAMS, CHUNKS_PER_WORKER
+from simulation_runner import build_suppliers, simulate, summarize, SIMULATION_DAYS
+from Store import CompactStore
+
+# --------------------------
+# Comparison Parameters
+# --------------------------
+POLICIES = ("fixed", "ml", "sim_code")
+# Metrics every policy reports; sim_code has no revenue, so it has no profit or ROI
+COMMON_METRICS = ["total_costs", "stockouts", "fill_rate", "orders_placed"]
+DEFAULT_METRIC = "stockouts"  # Defined the same way by all three models, unlike their cost structures
+MIN_REPLICATIONS = 20  # Replications before the first precision check
+MAX_REPLICATIONS = 1000
+DEFAULT_BATCH_SIZE = 20  # Replications added between precision checks
+
+
+def draw_scenario(seed_seq, sim_days=SIMULATION_DAYS, generator_params=None):
+    """
+    The common random numbers of one replication: daily demand, the seeds of the
+    suppliers' lead-time streams, sim_code's order delays, a seed for the global
+    stream, and the fixed policy's lead times, drawn like its own
+    np.random.randint(4, 7) ones. Demand, supplier and global streams are the ones
+    replication_engine.run_replication derives from the same seed_seq.
+
+    The supplier seeds are spawned here, once, because SeedSequence.spawn is stateful:
+    building suppliers from lead_time_seed in every run would give each policy
+    different streams depending on which policies ran before it.
+    """
+    demand_seed, lead_time_seed, delay_seed, fixed_lead_time_seed = seed_seq.spawn(4)
+    params = dict(DEFAULT_GENERATOR_PARAMS, **(generator_params or {}))
+    return {
+        "demand": DataGenerator(sim_days=sim_days, seed=demand_seed, **params).generate_demand_data(),
+        "supplier_seeds": lead_time_seed.spawn(4),
+        "delays": sim_code.draw_delays(sim_days, np.random.default_rng(delay_seed)),
+        "global_seed": lead_time_seed.generate_state(1)[0],
+        "fixed_lead_times": draw_lead_times(1, sim_days, np.random.default_rng(fixed_lead_time_seed))[0],
+    }
+
+
+def run_policy(policy, scenario, sim_days=SIMULATION_DAYS):
+    """Runs one policy on a drawn scenario and returns its COMMON_METRICS (plus profit and ROI where defined)."""
+    demand = scenario["demand"]
+    total_demand = sum(demand)
+    # Only the ML model's fitting draws from the global stream; seed it the same way for every policy
+    np.random.seed(scenario["global_seed"])
+
+    if policy == "sim_code":
+        env = simpy.Environment()
+        supply_chain = sim_code.SupplyChain(env, horizon=sim_days, demand_data=demand, delays=scenario["delays"])
+        env.run(until=sim_days)
+        stockouts = sum(row[3] for row in supply_chain.daily_data)
+        return {
+            "total_costs": supply_chain.total_holding_cost + supply_chain.total_stockout_cost
+                           + supply_chain.total_ordering_cost,
+            "stockouts": stockouts,
+            "fill_rate": 1 - stockouts / total_demand if total_demand else 1.0,
+            "orders_placed": supply_chain.orders_received,  # Counted on arrival, as Store.orders_received is
+        }
+
+    # The ML policy's suppliers replay the same lead-time streams in every comparison.
+    # The fixed policy keeps its own lead-time model, pre-drawn for the replication.
+    if policy not in ("fixed", "ml"):
+        raise ValueError(f"Unknown policy {policy!r}; expected one of {', '.join(POLICIES)}")
+    suppliers = build_suppliers(scenario["supplier_seeds"])
+    if policy == "fixed":
+        store, supply_chain = simulate(FixedOrderSupplyChain, demand, sim_days=sim_days,
+                                       store=CompactStore(sim_days, keep_history=False), suppliers=suppliers,
+                                       lead_times=scenario["fixed_lead_times"])
+    else:
+        from optimized_ml_supply_chain import OptimizedMLSupplyChain
+        store, supply_chain = simulate(OptimizedMLSupplyChain, demand, sim_days=sim_days,
+                                       store=CompactStore(sim_days, keep_history=False), suppliers=suppliers)
+    summary = summarize(store, supply_chain)
+    summary["fill_rate"] = 1 - summary["stockouts"] / total_demand if total_demand else 1.0
+    return summary
+
+
+def run_paired_replication(policies, seed_seq, sim_days=SIMULATION_DAYS, generator_params=None):
+    scenario = draw_scenario(seed_seq, sim_days, generator_params)
+    return {policy: run_policy(policy, scenario, sim_days) for policy in policies}
+
+
+def _run_chunk(policies, seed_seqs, sim_days, generator_params):
+    return [run_paired_replication(policies, seed_seq, sim_days, generator_params) for seed_seq in seed_seqs]
+
+
+class PairedComparison:
+    """
+    Per-replication results of several policies run on common random numbers.
+
+    columns[policy][metric] holds one value per replication, with row r of every
+    policy coming from the same scenario, so differences are taken row by row.
+    """
+
+    def __init__(self, policies, columns, metric, confidence, converged):
+        self.policies = list(policies)
+        self.columns = columns
+        self.metric = metric
+        self.confidence = confidence
+        self.converged = converged
+
+    @property
+    def n_replications(self):
+        return len(self.columns[self.policies[0]][self.metric])
+
+    def differences(self, policy_a, policy_b, metric=None):
+        """Per-replication values of policy_a minus policy_b."""
+        metric = metric or self.metric
+        return self.columns[policy_a][metric] - self.columns[policy_b][metric]
+
+    def paired_interval(self, policy_a, policy_b, metric=None):
+        """(mean, lower, upper) of the paired difference policy_a - policy_b."""
+        return confidence_interval(self.differences(policy_a, policy_b, metric), self.confidence)
+
+    def independent_half_width(self, policy_a, policy_b, metric=None):
+        """Half-width the interval would have if the two policies had been run on independent scenarios."""
+        metric = metric or self.metric
+        a, b = self.columns[policy_a][metric], self.columns[policy_b][metric]
+        if len(a) < 2:
+            return 0.0
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        return z * math.sqrt((a.var(ddof=1) + b.var(ddof=1)) / len(a))
+
+    def summary(self, metric=None):
+        """One row per policy pair: the paired difference, its interval and the unpaired half-width."""
+        metric = metric or self.metric
+        rows = []
+        for policy_a, policy_b in combinations(self.policies, 2):
+            mean, lower, upper = self.paired_interval(policy_a, policy_b, metric)
+            rows.append({
+                "pair": f"{policy_a} - {policy_b}",
+                "metric": metric,
+                "mean_difference": mean,
+                "lower": lower,
+                "upper": upper,
+                "half_width": (upper - lower) / 2,
+                "independent_half_width": self.independent_half_width(policy_a, policy_b, metric),
+                "replications": self.n_replications,
+            })
+        return rows
+
+
+def precision_reached(comparison, precision=None, relative_precision=None):
+    """True once every pair's interval half-width is within precision and/or relative_precision * |mean|."""
+    if precision is None and relative_precision is None:
+        return False
+    for row in comparison.summary():
+        if precision is not None and row["half_width"] > precision:
+            return False
+        if relative_precision is not None and row["half_width"] > relative_precision * abs(row["mean_difference"]):
+            return False
+    return True
+
+
+def compare_policies(policies=POLICIES, precision=None, relative_precision=None, metric=DEFAULT_METRIC,
+                     confidence=0.95, seed=None, sim_days=SIMULATION_DAYS, generator_params=None,
+                     min_replications=MIN_REPLICATIONS, max_replications=MAX_REPLICATIONS,
+                     batch_size=DEFAULT_BATCH_SIZE, max_workers=None):
+    """
+    Runs policies side by side on common random numbers over a process pool and
+    returns a PairedComparison.
+
+    Replication r of every policy sees the same demand, drawn from child r of
+    SeedSequence(seed), as are its pre-drawn lead times: the per-supplier streams
+    for the ML policy, the fixed policy's randint(4, 7)-style lead times and
+    sim_code's order delays, so each policy keeps its own lead-time model.
+
+    Replications are added in batches of batch_size after the first
+    min_replications. Runs stop once the paired interval of metric is within
+    precision (absolute) and/or relative_precision (relative to the mean difference)
+    for every pair, or after max_replications. Without a precision target, all
+    max_replications run. The results depend on the seed, not on the worker count.
+    """
+    policies = list(policies)
+    unknown = set(policies) - set(POLICIES)
+    if unknown:
+        raise ValueError(f"Unknown policies {sorted(unknown)}; expected some of {', '.join(POLICIES)}")
+    if metric not in COMMON_METRICS and "sim_code" in policies:
+        raise ValueError(f"sim_code does not report {metric!r}; use one of {', '.join(COMMON_METRICS)}")
+    children = np.random.SeedSequence(seed).spawn(max_replications)
+    max_workers = max_workers or os.cpu_count() or 1
+    results = []
+    comparison = None
+
+    def run_batch(pool, indices):
+        if pool is None:
+            return _run_chunk(policies, [children[i] for i in indices], sim_days, generator_params)
+        chunk_size = max(1, math.ceil(len(indices) / (max_workers * CHUNKS_PER_WORKER)))
+        chunks = [indices[i:i + chunk_size] for i in range(0, len(indices), chunk_size)]
+        futures = [pool.submit(_run_chunk, policies, [children[i] for i in chunk], sim_days, generator_params)
+                   for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        end = min(min_replications, max_replications)
+        while True:
+            results.extend(run_batch(pool, list(range(len(results), end))))
+            columns = {policy: {name: np.array([result[policy][name] for result in results])
+                                for name in results[0][policy]} for policy in policies}
+            converged = precision_reached(PairedComparison(policies, columns, metric, confidence, False),
+                                          precision, relative_precision)
+            comparison = PairedComparison(policies, columns, metric, confidence, converged)
+            if converged or end == max_replications:
+                return comparison
+            end = min(end + batch_size, max_replications)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compares policies on common random numbers with paired intervals.")
+    parser.add_argument("--policies", nargs="+", choices=POLICIES, default=list(POLICIES))
+    parser.add_argument("--metric", default=DEFAULT_METRIC, help="metric the stopping rule is applied to")
+    parser.add_argument("--precision", type=float, help="stop once every paired half-width is at most this")
+    parser.add_argument("--relative-precision", type=float,
+                        help="stop once every paired half-width is at most this fraction of its mean difference")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sim-days", type=int, default=SIMULATION_DAYS)
+    parser.add_argument("--min-replications", type=int, default=MIN_REPLICATIONS)
+    parser.add_argument("--max-replications", type=int, default=MAX_REPLICATIONS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    return parser.parse_args()
+
+
+def main(args):
+    comparison = compare_policies(args.policies, args.precision, args.relative_precision, args.metric,
+                                  args.confidence, args.seed, args.sim_days,
+                                  min_replications=args.min_replications, max_replications=args.max_replications,
+                                  batch_size=args.batch_size, max_workers=args.workers)
+    status = "precision reached" if comparison.converged else "stopped at max replications"
+    print(f"=== Paired comparison: {comparison.n_replications} replications ({status}) ===")
+    metrics = [args.metric] + [name for name in COMMON_METRICS if name != args.metric]
+    for metric in metrics:
+        print(f"\n{metric}:")
+        for row in comparison.summary(metric):
+            print(f"  {row['pair']:<20} {row['mean_difference']:>12.3f}  "
+                  f"[{row['lower']:.3f}, {row['upper']:.3f}]  ±{row['half_width']:.3f} "
+                  f"(independent runs: ±{row['independent_half_width']:.3f})")
+    return comparison
+
+
+if __name__ == "__main__":
+    main(parse_args())
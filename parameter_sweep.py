@@ -0,0 +1,206 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import numpy as np
+from data_generator import DataGenerator
+from fast_fixed_order import draw_lead_times, simulate_fixed_order_batch
+from replication_engine import confidence_interval, DEFAULT_GENERATOR_PARAMS, CHUNKS_PER_WORKER
+from simulation_runner import build_suppliers, SIMULATION_DAYS
+
+# --------------------------
+# Sweep Parameters
+# --------------------------
+DEFAULT_REPLICATIONS = 200
+HALVING_RATE = 3  # Successive halving keeps the best 1/HALVING_RATE of the candidates each round
+MIN_HALVING_REPLICATIONS = 25  # Replications per candidate in the first successive-halving round
+# Lead times of the candidates: FixedOrderSupplyChain's own randint(4, 7) draws, whoever the
+# supplier is, or each supplier's delivery-time model (used when the supplier itself is swept)
+LEAD_TIME_MODELS = ("policy", "supplier")
+
+
+class CommonRandomNumbers:
+    """
+    Demand and lead-time draws shared by every candidate of a sweep, so candidates
+    are compared on identical scenarios and their differences have far less noise.
+
+    With lead_time_model="policy" every supplier shares the lead times FixedOrderSupplyChain
+    draws on its own (randint(4, 7)), so suppliers only differ in cost, as in the SimPy
+    model. With "supplier" each supplier's lead times follow its delivery-time model,
+    all derived from the same uniform draws to keep supplier choices comparable. Row r
+    of every array is replication r.
+    """
+
+    def __init__(self, n_replications, sim_days=SIMULATION_DAYS, seed=None, generator_params=None, suppliers=None,
+                 lead_time_model="policy"):
+        if lead_time_model not in LEAD_TIME_MODELS:
+            raise ValueError(f"lead_time_model must be one of {', '.join(LEAD_TIME_MODELS)}")
+        demand_seed, lead_time_seed = np.random.SeedSequence(seed).spawn(2)
+        params = dict(DEFAULT_GENERATOR_PARAMS, **(generator_params or {}))
+        self.n_replications = n_replications
+        self.lead_time_model = lead_time_model
+        self.demand = DataGenerator(sim_days=sim_days, seed=demand_seed, **params).generate_demand_matrix(n_replications)
+
+        rng = np.random.default_rng(lead_time_seed)
+        self.suppliers = {s.name: s for s in (suppliers if suppliers is not None else build_suppliers())}
+        if lead_time_model == "policy":
+            lead_times = draw_lead_times(n_replications, sim_days, rng)
+            self.lead_times = {name: lead_times for name in self.suppliers}
+        else:
+            reliability_draws = rng.random((n_replications, sim_days))
+            range_draws = rng.random((n_replications, sim_days))
+            self.lead_times = {name: s.delivery_times_from_uniforms(reliability_draws, range_draws)
+                               for name, s in self.suppliers.items()}
+
+
+def evaluate_candidate(draws, candidate, n_replications):
+    """Runs one (reorder_point, order_quantity, supplier_name) candidate on the first n_replications draws."""
+    reorder_point, order_quantity, supplier_name = candidate
+    result = simulate_fixed_order_batch(draws.demand[:n_replications], draws.lead_times[supplier_name][:n_replications],
+                                        draws.suppliers[supplier_name], reorder_point, order_quantity)
+    return {"profit": result["profit"], "roi": result["roi"], "stockouts": result["stockouts"]}
+
+
+_WORKER_DRAWS = None
+
+
+def _init_worker(draws):
+    global _WORKER_DRAWS
+    _WORKER_DRAWS = draws
+
+
+def _evaluate_chunk(candidates, n_replications):
+    return [evaluate_candidate(_WORKER_DRAWS, candidate, n_replications) for candidate in candidates]
+
+
+def _evaluate(pool, draws, candidates, n_replications, max_workers):
+    if pool is None:
+        return [evaluate_candidate(draws, candidate, n_replications) for candidate in candidates]
+    chunk_size = max(1, math.ceil(len(candidates) / (max_workers * CHUNKS_PER_WORKER)))
+    futures = [pool.submit(_evaluate_chunk, candidates[i:i + chunk_size], n_replications)
+               for i in range(0, len(candidates), chunk_size)]
+    return [outcome for future in futures for outcome in future.result()]
+
+
+def _rank(candidates, outcomes, confidence):
+    """Builds result rows ranked by mean profit, with paired profit gaps to the best candidate."""
+    means = [float(np.mean(outcome["profit"])) for outcome in outcomes]
+    best_profit = outcomes[int(np.argmax(means))]["profit"]
+    rows = []
+    for (reorder_point, order_quantity, supplier_name), outcome in zip(candidates, outcomes):
+        mean_profit, profit_lower, profit_upper = confidence_interval(outcome["profit"], confidence)
+        gap, gap_lower, gap_upper = confidence_interval(best_profit - outcome["profit"], confidence)
+        rows.append({
+            "reorder_point": reorder_point,
+            "order_quantity": order_quantity,
+            "supplier": supplier_name,
+            "replications": len(outcome["profit"]),
+            "mean_profit": mean_profit,
+            "profit_ci_lower": profit_lower,
+            "profit_ci_upper": profit_upper,
+            "gap_to_best": gap,
+            "gap_ci_lower": gap_lower,
+            "gap_ci_upper": gap_upper,
+            "mean_roi": float(np.mean(outcome["roi"])),
+            "mean_stockouts": float(np.mean(outcome["stockouts"])),
+        })
+    return sorted(rows, key=lambda row: -row["mean_profit"])
+
+
+class SweepResult:
+    """Ranked table of sweep candidates, best first."""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: (-row["replications"], -row["mean_profit"]))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    @property
+    def best(self):
+        return self.rows[0]
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.rows)
+
+
+def build_grid(reorder_points, order_quantities, supplier_names=("Normal",)):
+    return list(product(reorder_points, order_quantities, supplier_names))
+
+
+def default_lead_time_model(supplier_names):
+    """Supplier delivery-time models only when the supplier is swept, else the policy's own lead times."""
+    return "supplier" if len(set(supplier_names)) > 1 else "policy"
+
+
+def grid_search(reorder_points, order_quantities, supplier_names=("Normal",), n_replications=DEFAULT_REPLICATIONS,
+                sim_days=SIMULATION_DAYS, seed=None, generator_params=None, max_workers=None, confidence=0.95,
+                lead_time_model=None):
+    """
+    Evaluates every (reorder_point, order_quantity, supplier) combination on the same
+    n_replications common random numbers, in parallel across candidates.
+
+    lead_time_model (see CommonRandomNumbers) defaults to FixedOrderSupplyChain's own
+    lead times, or to the suppliers' delivery-time models if several suppliers are swept.
+    """
+    candidates = build_grid(reorder_points, order_quantities, supplier_names)
+    lead_time_model = lead_time_model or default_lead_time_model(supplier_names)
+    draws = CommonRandomNumbers(n_replications, sim_days, seed, generator_params, lead_time_model=lead_time_model)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        outcomes = _evaluate(None, draws, candidates, n_replications, max_workers)
+    else:
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(draws,)) as pool:
+            outcomes = _evaluate(pool, draws, candidates, n_replications, max_workers)
+    return SweepResult(_rank(candidates, outcomes, confidence))
+
+
+def successive_halving(reorder_points, order_quantities, supplier_names=("Normal",),
+                       min_replications=MIN_HALVING_REPLICATIONS, max_replications=DEFAULT_REPLICATIONS * 4,
+                       halving_rate=HALVING_RATE, sim_days=SIMULATION_DAYS, seed=None, generator_params=None,
+                       max_workers=None, confidence=0.95, lead_time_model=None):
+    """
+    Adaptive search: all candidates start with min_replications, then each round keeps
+    the best 1/halving_rate of them and evaluates the survivors on halving_rate times
+    more replications, up to max_replications. Every round reuses the leading rows of
+    the same common random numbers. Eliminated candidates stay in the table with the
+    statistics of the last round they took part in. lead_time_model defaults as in
+    grid_search.
+    """
+    candidates = build_grid(reorder_points, order_quantities, supplier_names)
+    lead_time_model = lead_time_model or default_lead_time_model(supplier_names)
+    draws = CommonRandomNumbers(max_replications, sim_days, seed, generator_params, lead_time_model=lead_time_model)
+    max_workers = max_workers or os.cpu_count() or 1
+    pool = None if max_workers == 1 else ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(draws,))
+
+    rows = []
+    n_replications = min(min_replications, max_replications)
+    try:
+        while True:
+            outcomes = _evaluate(pool, draws, candidates, n_replications, max_workers)
+            ranked = _rank(candidates, outcomes, confidence)
+            if len(candidates) == 1 or n_replications >= max_replications:
+                rows.extend(ranked)
+                break
+            n_survivors = max(1, math.ceil(len(candidates) / halving_rate))
+            rows.extend(ranked[n_survivors:])
+            candidates = [(row["reorder_point"], row["order_quantity"], row["supplier"]) for row in ranked[:n_survivors]]
+            n_replications = min(n_replications * halving_rate, max_replications)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return SweepResult(rows)
+
+
+if __name__ == "__main__":
+    result = successive_halving(range(10, 101, 10), range(50, 301, 25), supplier_names=("Cheap", "Normal", "Premium"),
+                                seed=1)
+    print("=== Best (s, Q, supplier) candidates by mean profit ===")
+    for row in result.rows[:10]:
+        print(f"s={row['reorder_point']}, Q={row['order_quantity']}, {row['supplier']}: "
+              f"profit ${row['mean_profit']:.2f} (95% CI {row['profit_ci_lower']:.2f} to {row['profit_ci_upper']:.2f}), "
+              f"{row['replications']} replications")
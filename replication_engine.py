@@ -0,0 +1,143 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+import numpy as np
+from checkpoint import load_object, save_object
+from data_generator import DataGenerator
+from Store import CompactStore
+from simulation_runner import (build_suppliers, simulate, summarize, SIMULATION_DAYS, SEASONALITY_FACTOR, TREND_FACTOR,
+                               VOLATILITY, SHOCK_PROBABILITY)
+
+# --------------------------
+# Replication Parameters
+# --------------------------
+SUMMARY_FIELDS = ["total_revenue", "total_costs", "profit", "roi", "stockouts", "orders_placed", "final_inventory"]
+CHUNKS_PER_WORKER = 4  # Work chunks handed to each worker, for load balancing across uneven runs
+
+DEFAULT_GENERATOR_PARAMS = {
+    "seasonality_factor": SEASONALITY_FACTOR,
+    "trend_factor": TREND_FACTOR,
+    "volatility": VOLATILITY,
+    "shock_prob": SHOCK_PROBABILITY,
+}
+
+
+def confidence_interval(values, confidence=0.95):
+    """Returns (mean, lower, upper) using a normal approximation of the sample mean."""
+    values = np.asarray(values, dtype=float)
+    mean = float(values.mean())
+    if len(values) < 2:
+        return mean, mean, mean
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * float(values.std(ddof=1)) / math.sqrt(len(values))
+    return mean, mean - half_width, mean + half_width
+
+
+class ReplicationResult:
+    """
+    Columnar collection of per-replication summaries. Each entry of `columns`
+    is a NumPy array with one value per replication, in replication order.
+    """
+
+    def __init__(self, policy_name, columns):
+        self.policy_name = policy_name
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["replication"])
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def mean(self, field):
+        return float(np.mean(self.columns[field]))
+
+    def confidence_interval(self, field, confidence=0.95):
+        return confidence_interval(self.columns[field], confidence)
+
+    def summary(self, confidence=0.95):
+        """Returns {field: (mean, lower, upper)} for every summary field."""
+        return {field: self.confidence_interval(field, confidence) for field in SUMMARY_FIELDS}
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+
+#Runs one replication with its own demand and lead-time streams derived from seed_seq.
+def run_replication(supply_chain_class, seed_seq, sim_days=SIMULATION_DAYS, generator_params=None):
+    demand_seed, lead_time_seed = seed_seq.spawn(2)
+    params = dict(DEFAULT_GENERATOR_PARAMS, **(generator_params or {}))
+    demand_data = DataGenerator(sim_days=sim_days, seed=demand_seed, **params).generate_demand_data()
+
+    # Suppliers get their own lead-time streams; the fixed policy's default draws use the global stream
+    np.random.seed(lead_time_seed.generate_state(1)[0])
+
+    store, supply_chain = simulate(supply_chain_class, demand_data, sim_days=sim_days,
+                                   store=CompactStore(sim_days, keep_history=False),
+                                   suppliers=build_suppliers(lead_time_seed))
+    return summarize(store, supply_chain)
+
+
+def _run_chunk(supply_chain_class, seed_seqs, sim_days, generator_params):
+    return [run_replication(supply_chain_class, seed_seq, sim_days, generator_params) for seed_seq in seed_seqs]
+
+
+def run_replications(supply_chain_class, n_replications, seed=None, sim_days=SIMULATION_DAYS,
+                     generator_params=None, max_workers=None, checkpoint_path=None):
+    """
+    Runs n_replications independent replications of a policy over a process pool.
+
+    Every replication gets its own child of SeedSequence(seed), so results depend
+    only on the seed and the replication index, not on the number of workers.
+
+    With checkpoint_path, the summaries finished so far are saved there after every
+    chunk. A rerun with the same arguments (and a fixed seed) skips the replications
+    already saved, so an interrupted batch resumes where it stopped.
+    """
+    seed_seq = np.random.SeedSequence(seed)
+    children = seed_seq.spawn(n_replications)
+    run_key = (supply_chain_class.__qualname__, n_replications, seed_seq.entropy, sim_days,
+               sorted((generator_params or {}).items()))
+    done = {}
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        saved = load_object(checkpoint_path)
+        if saved["key"] == run_key:
+            done = saved["summaries"]
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(1, math.ceil(n_replications / (max_workers * CHUNKS_PER_WORKER)))
+    remaining = [index for index in range(n_replications) if index not in done]
+    chunks = [remaining[i:i + chunk_size] for i in range(0, len(remaining), chunk_size)]
+
+    def record(indices, chunk_summaries):
+        done.update(zip(indices, chunk_summaries))
+        if checkpoint_path is not None:
+            save_object({"key": run_key, "summaries": done}, checkpoint_path)
+
+    if max_workers == 1:
+        for chunk in chunks:
+            record(chunk, _run_chunk(supply_chain_class, [children[i] for i in chunk], sim_days, generator_params))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_run_chunk, supply_chain_class, [children[i] for i in chunk], sim_days,
+                                   generator_params): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                record(futures[future], future.result())
+
+    summaries = [done[index] for index in range(n_replications)]
+
+    columns = {"replication": np.arange(n_replications)}
+    for field in SUMMARY_FIELDS:
+        columns[field] = np.array([summary[field] for summary in summaries])
+    return ReplicationResult(supply_chain_class.__name__, columns)
+
+
+if __name__ == "__main__":
+    from fixed_order_supply_chain import FixedOrderSupplyChain
+
+    result = run_replications(FixedOrderSupplyChain, n_replications=200, seed=1)
+    print(f"=== {result.policy_name}: {len(result)} replications ===")
+    for field, (mean, lower, upper) in result.summary().items():
+        print(f"{field}: {mean:.2f} (95% CI {lower:.2f} to {upper:.2f})")
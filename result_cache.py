@@ -0,0 +1,279 @@
+import hashlib
+import importlib
+import inspect
+import io
+import json
+import os
+import zipfile
+import numpy as np
+from result_sink import ColumnarSink
+
+# --------------------------
+# Result Cache Settings
+# --------------------------
+# Default cache directory, in the user's cache directory rather than the working directory
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                         "supply_chain_simulation")
+MAX_CACHE_BYTES = 256 * 1024 * 1024  # Total size of cached entries before the least recently used are evicted
+CACHE_FORMAT_VERSION = 2  # Part of every key; bump it to invalidate all existing entries
+ENTRY_SUFFIX = ".npz"
+SUMMARY_ARRAY = "summary"  # Name of the JSON summary inside an entry's .npz file
+RANDOM_STATE_ARRAY = "random_state"  # Name of the JSON post-run random state inside an entry's .npz file
+STORE_PREFIX = "store:"  # Prefix of the store history arrays inside an entry's .npz file
+# Modules whose constants and source decide a run's results besides the policy's own
+# module. The key covers these and every module of this package they import.
+MODEL_MODULES = ["Store", "supplier", "simulation_runner"]
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def module_fingerprint(module_name):
+    """The module's CAPS constants and a digest of its source file."""
+    module = importlib.import_module(module_name)
+    constants = {name: value for name, value in vars(module).items()
+                 if name.isupper() and isinstance(value, (bool, int, float, str, tuple))}
+    with open(inspect.getsourcefile(module), "rb") as file:
+        return {"constants": constants, "source": digest(file.read())}
+
+
+def local_dependencies(module_names):
+    """The named modules and every module of this package they import, directly or indirectly."""
+    found = set()
+    pending = list(module_names)
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        module = importlib.import_module(name)
+        path = getattr(module, "__file__", None)
+        if path is None or os.path.dirname(os.path.abspath(path)) != PACKAGE_DIR:
+            continue
+        found.add(name)
+        for value in vars(module).values():
+            dependency = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+            if isinstance(dependency, str):
+                pending.append(dependency)
+    return sorted(found)
+
+
+def describe_seed(seed):
+    if isinstance(seed, np.random.SeedSequence):
+        return {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+    return seed
+
+
+def describe_generator(generator):
+    return {
+        "sim_days": generator.sim_days,
+        "seasonality_factor": generator.seasonality_factor,
+        "trend_factor": generator.trend_factor,
+        "volatility": generator.volatility,
+        "shock_prob": generator.shock_prob,
+        "seed": describe_seed(generator.seed),
+    }
+
+
+def describe_supplier(supplier):
+    """The supplier's terms and the exact position of its lead-time stream."""
+    return {
+        "name": supplier.name,
+        "reliability": supplier.reliability,
+        "cost_multiplier": supplier.cost_multiplier,
+        "delivery_time_range": list(supplier.delivery_time_range),
+        "per_unit_price": supplier.per_unit_price,
+        "shipping_cost": supplier.shipping_cost,
+        "rng_state": supplier.rng.bit_generator.state,
+        "buffered_delivery_times": supplier.delivery_times[supplier.next_delivery_time:].tolist(),
+    }
+
+
+def global_rng_digest():
+    # The fixed policy's default lead times and the ML model draw from the global stream
+    _, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    return digest(keys.tobytes() + repr((position, has_gauss, cached_gaussian)).encode())
+
+
+def capture_random_state(suppliers):
+    """Where a finished run left the global np.random stream and each supplier's lead-time stream."""
+    name, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    return {
+        "global": [name, keys.tolist(), position, has_gauss, cached_gaussian],
+        "suppliers": [{"rng_state": supplier.rng.bit_generator.state,
+                       "delivery_times": supplier.delivery_times.tolist(),
+                       "next_delivery_time": supplier.next_delivery_time} for supplier in suppliers],
+    }
+
+
+def restore_random_state(random_state, suppliers):
+    """Moves the global stream and the suppliers' streams to where capture_random_state found them."""
+    name, keys, position, has_gauss, cached_gaussian = random_state["global"]
+    np.random.set_state((name, np.array(keys, dtype=np.uint32), position, has_gauss, cached_gaussian))
+    for supplier, state in zip(suppliers, random_state["suppliers"]):
+        supplier.rng.bit_generator.state = state["rng_state"]
+        supplier.delivery_times = np.array(state["delivery_times"], dtype=np.int64)
+        supplier.next_delivery_time = state["next_delivery_time"]
+
+
+def scenario_key(supply_chain_class, demand_data, suppliers, sim_days, policy_kwargs=None, data_generator=None):
+    """
+    Content hash of everything that decides a run's results.
+
+    It covers the policy class, and the constants and source of its module, of the
+    store, supplier and runner modules, and of every module of this package those
+    import (e.g. the result sink, event-driven helpers and rolling statistics). It also covers the policy keyword
+    arguments, the supplier definitions and their lead-time RNG states, the global
+    np.random state, the horizon, and the demand values. With data_generator, the
+    generator's parameters and seed are included as well. Runs whose random streams
+    are not seeded get a new key every time, so they are never served from the cache.
+    """
+    demand = np.ascontiguousarray(demand_data, dtype=np.int64)
+    scenario = {
+        "version": CACHE_FORMAT_VERSION,
+        "policy": f"{supply_chain_class.__module__}.{supply_chain_class.__qualname__}",
+        "models": {name: module_fingerprint(name)
+                   for name in local_dependencies([supply_chain_class.__module__] + MODEL_MODULES)},
+        "policy_kwargs": policy_kwargs or {},
+        "suppliers": [describe_supplier(supplier) for supplier in suppliers],
+        "global_rng": global_rng_digest(),
+        "sim_days": sim_days,
+        "demand": digest(demand.tobytes()),
+        "generator": describe_generator(data_generator) if data_generator is not None else None,
+    }
+    return digest(json.dumps(scenario, sort_keys=True, default=str).encode())
+
+
+class CachedResult:
+    """
+    A cached run: its summary dict, per-day arrays (e.g. the ColumnarSink columns) and
+    the random state it left behind (see capture_random_state).
+    """
+
+    def __init__(self, summary, arrays, random_state=None):
+        self.summary = summary
+        self.arrays = arrays
+        self.random_state = random_state
+
+    def restore_random_state(self, suppliers):
+        """Leaves the random streams as simulating the run would have, so later runs see the same draws."""
+        if self.random_state is not None:
+            restore_random_state(self.random_state, suppliers)
+
+    def write_csv(self, path, columns):
+        """Writes the per-day arrays named in columns ((name, dtype) pairs) to a CSV file."""
+        n_rows = len(self.arrays[columns[0][0]])
+        sink = ColumnarSink(columns, n_rows, path=path)
+        sink.extend(*[self.arrays[name] for name, _ in columns])
+        sink.close()
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of simulation results, one compressed .npz file
+    per scenario_key. Reading an entry refreshes its modification time, and once the
+    entries exceed max_bytes the least recently used are deleted.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """Returns the CachedResult stored under key, or None."""
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+            summary = json.loads(str(arrays.pop(SUMMARY_ARRAY)))
+            random_state = json.loads(str(arrays.pop(RANDOM_STATE_ARRAY))) if RANDOM_STATE_ARRAY in arrays else None
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Truncated or corrupt, e.g. by a process that died while copying it in; drop it and miss
+            self.misses += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        os.utime(path)
+        self.hits += 1
+        return CachedResult(summary, arrays, random_state)
+
+    def put(self, key, summary, arrays, random_state=None):
+        """
+        Stores summary (a JSON-serializable dict), a dict of arrays and, optionally, the
+        run's post-run random state (from capture_random_state) under key.
+        """
+        buffer = io.BytesIO()
+        entry = {SUMMARY_ARRAY: np.array(json.dumps(summary, default=json_default))}
+        if random_state is not None:
+            entry[RANDOM_STATE_ARRAY] = np.array(json.dumps(random_state, default=json_default))
+        np.savez_compressed(buffer, **entry, **arrays)
+        temporary_path = f"{self.path(key)}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(buffer.getbuffer())
+        os.replace(temporary_path, self.path(key))
+        self.evict()
+        return CachedResult(summary, arrays, random_state)
+
+    def entries(self):
+        """(mtime, size, path) of every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(ENTRY_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
+
+
+def run_arrays(store, supply_chain):
+    """Per-day arrays of a finished run: its sink columns, if it had an in-memory sink, and the store's histories."""
+    arrays = {}
+    sink = getattr(supply_chain, "sink", None)
+    if sink is not None and sink.path is None:
+        arrays.update(sink.data())
+    arrays[STORE_PREFIX + "demand_history"] = np.asarray(store.demand_history, dtype=np.int64)
+    arrays[STORE_PREFIX + "order_history"] = np.asarray(store.order_history, dtype=np.int64)
+    arrays[STORE_PREFIX + "supplier_history"] = np.asarray(store.supplier_history, dtype=str)
+    return arrays
+
+
+def json_default(value):
+    """json.dumps default that turns NumPy scalars into Python numbers."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
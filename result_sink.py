@@ -0,0 +1,181 @@
+import csv
+import os
+import shutil
+import numpy as np
+
+# --------------------------
+# Result Sink Configuration
+# --------------------------
+FLOAT_FORMAT = "%.2f"  # Precision of float columns in CSV output
+SUPPLIER_NAME_DTYPE = "U16"  # Initial width of supplier names; widened when a longer name is written
+
+FIXED_ORDER_COLUMNS = [
+    ("Day", np.int64), ("Inventory", np.int64), ("Demand", np.int64), ("Fulfilled", np.int64),
+    ("Stockouts", np.int64), ("Order Quantity", np.int64), ("Supplier", SUPPLIER_NAME_DTYPE),
+    ("Holding Cost", np.float64), ("Stockout Cost", np.float64), ("Supplier Cost", np.float64),
+    ("Revenue", np.float64), ("Profit", np.float64), ("ROI", np.float64),
+]
+
+FILE_FORMATS = {".csv": "csv", ".parquet": "parquet", ".npy": "npy"}
+
+
+def with_string_width(columns, name, width):
+    """Returns columns with the string column name at least width characters wide."""
+    return [(column, f"U{max(width, np.dtype(dtype).itemsize // 4)}") if column == name else (column, dtype)
+            for column, dtype in columns]
+
+
+class ColumnarSink:
+    """
+    Buffers per-day simulation rows in preallocated NumPy arrays, one per column,
+    and writes them out in bulk.
+
+    Parameters:
+        columns (list): (name, dtype) pairs in output order.
+        n_rows (int): Expected number of rows, usually the simulation horizon.
+        path (str, optional): Output file. If None, rows are only kept in memory.
+        file_format (str, optional): "csv", "parquet" or "npy"; inferred from the
+            path's extension when omitted. "npy" writes a structured array (which
+            np.load can memory-map) holding the rows actually written.
+        flush_every (int, optional): Write buffered rows every N rows instead of only
+            at close. The buffer is then reused, so memory stays bounded by N rows.
+
+    String columns grow to fit longer values. A .npy file can no longer grow once rows
+    have been flushed to it, so size such columns up front (see with_string_width).
+    """
+
+    def __init__(self, columns, n_rows, path=None, file_format=None, flush_every=None):
+        self.columns = list(columns)
+        self.names = [name for name, _ in self.columns]
+        self.n_rows = n_rows
+        self.path = path
+        self.file_format = file_format or (FILE_FORMATS.get(os.path.splitext(path)[1]) if path else None)
+        if path is not None and self.file_format not in FILE_FORMATS.values():
+            raise ValueError(f"Unsupported result file format for {path!r}")
+        self.flush_every = flush_every
+
+        capacity = flush_every if (path is not None and flush_every) else n_rows
+        self.buffers = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in self.columns}
+        self.string_columns = [index for index, (_, dtype) in enumerate(self.columns) if np.dtype(dtype).kind == "U"]
+        self.size = 0
+        self.rows_written = 0
+        self.closed = False
+        self._writer = None
+
+    def append(self, *values):
+        """Adds one row, given in column order."""
+        if self.size == len(self.buffers[self.names[0]]):
+            if self.path is not None and self.flush_every:
+                self.flush()
+            else:
+                self._grow()
+        for index in self.string_columns:
+            self._fit_strings(self.names[index], len(str(values[index])))
+        for name, value in zip(self.names, values):
+            self.buffers[name][self.size] = value
+        self.size += 1
+        if self.flush_every and self.path is not None and self.size == self.flush_every:
+            self.flush()
+
+    def extend(self, *columns):
+        """Adds a block of rows, given as one array per column in column order."""
+        n_new = len(columns[0])
+        for index in self.string_columns:
+            self._fit_strings(self.names[index], np.asarray(columns[index], dtype=str).dtype.itemsize // 4)
+        written = 0
+        while written < n_new:
+            capacity = len(self.buffers[self.names[0]])
+            if self.size == capacity:
+                if self.path is not None and self.flush_every:
+                    self.flush()
+                else:
+                    self._grow(self.size + n_new - written)
+                continue
+            count = min(n_new - written, capacity - self.size)
+            for name, values in zip(self.names, columns):
+                self.buffers[name][self.size:self.size + count] = values[written:written + count]
+            self.size += count
+            written += count
+            if self.flush_every and self.path is not None and self.size == self.flush_every:
+                self.flush()
+
+    def _fit_strings(self, name, width):
+        """Widens the string column name to hold width characters."""
+        buffer = self.buffers[name]
+        if width <= buffer.dtype.itemsize // 4:
+            return
+        if self.file_format == "npy" and self.rows_written:
+            raise ValueError(f"Column {name!r} needs {width} characters, but {self.path} already holds rows "
+                             f"of width {buffer.dtype.itemsize // 4}; size the column up front")
+        self.buffers[name] = buffer.astype(f"U{width}")
+        self.columns = with_string_width(self.columns, name, width)
+
+    def _grow(self, min_capacity=0):
+        for name in self.names:
+            self.buffers[name] = np.resize(self.buffers[name], max(2 * len(self.buffers[name]), min_capacity))
+
+    def data(self):
+        """Returns {column: array} views of the rows currently buffered."""
+        return {name: self.buffers[name][:self.size] for name in self.names}
+
+    def flush(self):
+        """Writes buffered rows to the output file and empties the buffer."""
+        if self.path is None or self.size == 0:
+            return
+        getattr(self, f"_write_{self.file_format}")(self.data())
+        self.rows_written += self.size
+        self.size = 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        if self.file_format == "csv" and self.rows_written == 0 and self.path is not None:
+            self._write_csv(self.data())
+        if self._writer is not None and self.file_format == "parquet":
+            self._writer.close()
+        if self.file_format == "npy" and self.path is not None:
+            self._finish_npy()
+        self._writer = None
+        self.closed = True
+
+    def _write_csv(self, data):
+        mode = "a" if self.rows_written else "w"
+        formatted = [np.char.mod(FLOAT_FORMAT, data[name]) if np.issubdtype(dtype, np.floating) else data[name]
+                     for name, dtype in self.columns]
+        with open(self.path, mode=mode, newline="") as file:
+            writer = csv.writer(file)
+            if mode == "w":
+                writer.writerow(self.names)
+            writer.writerows(zip(*[column.tolist() for column in formatted]))
+
+    def _write_parquet(self, data):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Writing Parquet results requires the 'pyarrow' package") from exc
+        table = pa.table(data)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def _write_npy(self, data):
+        # Rows go to a raw side file first; close() prefixes the header once the row count is known
+        rows = np.empty(self.size, dtype=np.dtype(self.columns))
+        for name in self.names:
+            rows[name] = data[name]
+        with open(f"{self.path}.rows", "ab" if self.rows_written else "wb") as file:
+            rows.tofile(file)
+
+    def _finish_npy(self):
+        dtype = np.dtype(self.columns)
+        rows_path = f"{self.path}.rows"
+        with open(self.path, "wb") as file:
+            np.lib.format.write_array_header_1_0(file, {"descr": np.lib.format.dtype_to_descr(dtype),
+                                                        "fortran_order": False, "shape": (self.rows_written,)})
+            if self.rows_written:
+                with open(rows_path, "rb") as rows:
+                    shutil.copyfileobj(rows, file)
+        if self.rows_written:
+            os.remove(rows_path)
@@ -0,0 +1,105 @@
+import math
+import numpy as np
+
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer over the most recent observations with running
+    statistics, so each push and each statistic costs O(1) regardless of history length.
+
+    Parameters:
+        size (int): Number of observations in the window.
+        ewma_alpha (float, optional): Smoothing factor of the exponentially weighted
+            moving average. Defaults to 2 / (size + 1).
+    """
+
+    def __init__(self, size, ewma_alpha=None):
+        self.size = size
+        self.ewma_alpha = ewma_alpha if ewma_alpha is not None else 2 / (size + 1)
+        self.values = [0] * size
+        self.position = 0
+        self.count = 0
+        self.total = 0
+        self.total_squares = 0
+        self.first = None
+        self.latest = None
+        self.ewma = None
+
+    def push(self, value):
+        """Adds an observation, evicting the oldest one once the window is full."""
+        if self.count >= self.size:
+            oldest = self.values[self.position]
+            self.total -= oldest
+            self.total_squares -= oldest * oldest
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+        self.count += 1
+        self.total += value
+        self.total_squares += value * value
+
+        if self.first is None:
+            self.first = value
+            self.ewma = value
+        else:
+            self.ewma += self.ewma_alpha * (value - self.ewma)
+        self.latest = value
+
+    def extend(self, values):
+        """Adds a block of observations; costs O(size) plus one vectorized EWMA update."""
+        values = np.asarray(values).tolist()
+        if self.first is None and values:
+            self.push(values[0])
+            values = values[1:]
+        if len(values) < self.size:
+            for value in values:
+                self.push(value)
+            return
+
+        tail = values[-self.size:]
+        self.values = list(tail)
+        self.position = 0
+        self.count += len(values)
+        self.total = sum(tail)
+        self.total_squares = sum(value * value for value in tail)
+        decay = 1 - self.ewma_alpha
+        weights = self.ewma_alpha * decay ** np.arange(len(values) - 1, -1, -1)
+        self.ewma = float(decay ** len(values) * self.ewma + weights @ np.asarray(values, dtype=float))
+        self.latest = values[-1]
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    @property
+    def full(self):
+        return self.count >= self.size
+
+    @property
+    def oldest(self):
+        """Oldest observation still in the window."""
+        return self.values[self.position] if self.full else self.values[0]
+
+    @property
+    def mean(self):
+        return self.total / max(len(self), 1)
+
+    @property
+    def variance(self):
+        """Population variance of the observations in the window."""
+        n = max(len(self), 1)
+        mean = self.total / n
+        return max(self.total_squares / n - mean * mean, 0.0)
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def depletion_rate(self):
+        """Change from the first observation ever seen to the latest, spread over the window size."""
+        return (self.latest - self.first) / self.size
+
+    def to_list(self):
+        """Returns the observations in the window, oldest first."""
+        if not self.full:
+            return self.values[:self.count]
+        return self.values[self.position:] + self.values[:self.position]
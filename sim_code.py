@@ -1,6 +1,8 @@
+import csv
 import simpy
 import numpy as np
-import pandas as pd
+from event_log import SILENT_LOG, DAY, ORDER_PLACED, ORDER_RECEIVED
+from event_driven import prefix_sums, first_day_below, held_units, inventory_path
 
 # Simulation Parameters
 SIMULATION_DAYS = 100
@@ -20,77 +22,193 @@ ORDERING_COST = 20
 DEMAND_MEAN = 10
 DEMAND_STD = 3
 
+SUPPLIER_NAME = "Default"  # Supplier reported in order events
+
+CSV_FILENAME = "supply_chain_simpy_simulation.csv"
+DAILY_DATA_COLUMNS = ["Day", "Customer Demand", "Inventory Level", "Lost Sales", "Holding Cost", "Stockout Cost", "Total Ordering Cost"]
+
 class SupplyChain:
-    def __init__(self, env):
+    """
+    With event_driven=True, demand for the whole horizon is drawn up front and the
+    process only wakes up on order arrivals and on days the reorder point is crossed;
+    the quiet days in between are recorded in bulk with holding costs in closed form.
+    Demand is then drawn before any disruption delays, so the random stream is
+    consumed in a different order than in the day-by-day mode.
+
+    The inventory policy defaults to the module constants and can be set per instance.
+    Order and daily events go to event_log (an event_log.EventLog) instead of stdout.
+
+    demand_data (a list or array of daily demand) and delays (an iterable of order
+    delays in days, e.g. from draw_delays) replace the np.random draws, so the
+    policy can be run on the same pre-drawn scenario as the other policies.
+    """
+    def __init__(self, env, event_driven=False, horizon=SIMULATION_DAYS, reorder_point=REORDER_POINT,
+                 order_quantity=ORDER_QUANTITY, initial_inventory=INITIAL_INVENTORY, event_log=None,
+                 demand_data=None, delays=None):
         self.env = env
-        self.inventory = INITIAL_INVENTORY
+        self.demand_data = demand_data
+        self.delays = iter(delays) if delays is not None else None
+        self.reorder_point = reorder_point
+        self.order_quantity = order_quantity
+        self.inventory = initial_inventory
         self.pending_orders = []
         self.order_pending = False
+        self.arrival_day = None
+        self.event_log = event_log if event_log is not None else SILENT_LOG
 
         self.total_holding_cost = 0
         self.total_stockout_cost = 0
         self.total_ordering_cost = 0
+        self.orders_received = 0
         self.daily_data = []
 
         # Start simulation processes
-        self.env.process(self.customer_demand())
-        self.env.process(self.inventory_management())
+        if event_driven:
+            self.env.process(self.run_event_driven(horizon))
+        else:
+            self.env.process(self.customer_demand())
+            self.env.process(self.inventory_management())
 
     def customer_demand(self):
         """Simulates daily customer demand affecting inventory."""
+        if self.demand_data is not None:
+            for customer_demand in self.demand_data:
+                self.fulfill_demand(int(customer_demand))
+                yield self.env.timeout(1)
+            return
         while True:
             customer_demand = max(0, int(np.random.normal(DEMAND_MEAN, DEMAND_STD)))
-
-            if self.inventory >= customer_demand:
-                self.inventory -= customer_demand
-                lost_sales = 0
-            else:
-                lost_sales = customer_demand - self.inventory
-                self.inventory = 0
-
-            holding_cost = self.inventory * HOLDING_COST_PER_UNIT
-            stockout_cost = lost_sales * STOCKOUT_COST_PER_UNIT
-            self.total_holding_cost += holding_cost
-            self.total_stockout_cost += stockout_cost
-
-            self.daily_data.append([
-                self.env.now, customer_demand, self.inventory, lost_sales,
-                holding_cost, stockout_cost, self.total_ordering_cost
-            ])
-
+            self.fulfill_demand(customer_demand)
             yield self.env.timeout(1)
 
+    def fulfill_demand(self, customer_demand):
+        opening_inventory = self.inventory
+        if self.inventory >= customer_demand:
+            self.inventory -= customer_demand
+            lost_sales = 0
+        else:
+            lost_sales = customer_demand - self.inventory
+            self.inventory = 0
+
+        holding_cost = self.inventory * HOLDING_COST_PER_UNIT
+        stockout_cost = lost_sales * STOCKOUT_COST_PER_UNIT
+        self.total_holding_cost += holding_cost
+        self.total_stockout_cost += stockout_cost
+        self.event_log.record(self.env.now, DAY, inventory=opening_inventory, demand=customer_demand,
+                              fulfilled=opening_inventory - self.inventory)
+
+        self.daily_data.append([
+            self.env.now, customer_demand, self.inventory, lost_sales,
+            holding_cost, stockout_cost, self.total_ordering_cost
+        ])
+
     def inventory_management(self):
         """Monitors inventory and places orders when stock is low."""
         while True:
-            if self.inventory < REORDER_POINT and not self.order_pending:
-                self.order_pending = True  # Mark order as pending
+            if self.inventory < self.reorder_point and not self.order_pending:
+                delay = self.place_order()
+                self.env.process(self.receive_order(delay, self.order_quantity))
+            yield self.env.timeout(1)
 
-                delay = LEAD_TIME + DELIVERY_TIME
-                if np.random.rand() < DISRUPTION_PROBABILITY:
-                    delay += np.random.randint(DISRUPTION_EXTRA_DELAY[0], DISRUPTION_EXTRA_DELAY[1] + 1)
+    def place_order(self):
+        """Places a replenishment order and returns its delay in days."""
+        self.order_pending = True  # Mark order as pending
 
-                self.pending_orders.append((self.env.now, ORDER_QUANTITY, self.env.now + delay))
-                self.total_ordering_cost += ORDERING_COST
-                print(f'Day {self.env.now}: Order placed, arriving in {delay} days')
+        if self.delays is not None:
+            delay = int(next(self.delays))
+        else:
+            delay = LEAD_TIME + DELIVERY_TIME
+            if np.random.rand() < DISRUPTION_PROBABILITY:
+                delay += np.random.randint(DISRUPTION_EXTRA_DELAY[0], DISRUPTION_EXTRA_DELAY[1] + 1)
 
-                self.env.process(self.receive_order(delay, ORDER_QUANTITY))
-            yield self.env.timeout(1)
+        self.pending_orders.append((self.env.now, self.order_quantity, self.env.now + delay))
+        self.total_ordering_cost += ORDERING_COST
+        self.event_log.record(self.env.now, ORDER_PLACED, quantity=self.order_quantity, supplier=SUPPLIER_NAME,
+                              delivery_time=delay)
+        return delay
 
     def receive_order(self, delay, quantity):
         """Handles order arrivals after lead time."""
         yield self.env.timeout(delay)
         self.inventory += quantity
         self.order_pending = False  # Reset flag after order is received
-        print(f'Day {self.env.now}: Order received, new inventory = {self.inventory}')
-
-# Run the simulation
-env = simpy.Environment()
-supply_chain = SupplyChain(env)
-env.run(until=SIMULATION_DAYS)
-
-columns = ["Day", "Customer Demand", "Inventory Level", "Lost Sales", "Holding Cost", "Stockout Cost", "Total Ordering Cost"]
-df = pd.DataFrame(supply_chain.daily_data, columns=columns)
-
-df.to_csv("supply_chain_simpy_simulation.csv", index=False)
-print("Simulation complete. Data saved to 'supply_chain_simpy_simulation.csv'.")
+        self.orders_received += 1
+        self.event_log.record(self.env.now, ORDER_RECEIVED, quantity=quantity, supplier=SUPPLIER_NAME,
+                              inventory=self.inventory)
+
+    def run_event_driven(self, horizon):
+        """Single process that jumps from one order arrival or reorder day to the next."""
+        if self.demand_data is not None:
+            demand = np.asarray(self.demand_data[:horizon], dtype=np.int64)
+            horizon = len(demand)
+        else:
+            demand = np.maximum(np.trunc(np.random.normal(DEMAND_MEAN, DEMAND_STD, size=horizon)), 0).astype(np.int64)
+        self.demand_array = demand
+        self.cumulative_demand, self.cumulative_demand_sums = prefix_sums(demand)
+
+        day = 0
+        while day < horizon:
+            if self.arrival_day is not None:
+                event_day = min(max(self.arrival_day, day), horizon)
+            else:
+                event_day = first_day_below(self.cumulative_demand, day, horizon, self.inventory, self.reorder_point)
+            if event_day > day:
+                self.skip_quiet_days(day, event_day)
+                yield self.env.timeout(event_day - day)
+                day = event_day
+            if day < horizon:
+                # Same order as the day-by-day processes: arrival, demand, then the reorder check
+                if self.arrival_day is not None and self.arrival_day <= day:
+                    self.inventory += self.order_quantity
+                    self.order_pending = False
+                    self.orders_received += 1
+                    self.arrival_day = None
+                    self.event_log.record(self.env.now, ORDER_RECEIVED, quantity=self.order_quantity,
+                                          supplier=SUPPLIER_NAME, inventory=self.inventory)
+                self.fulfill_demand(int(demand[day]))
+                if self.inventory < self.reorder_point and not self.order_pending:
+                    self.arrival_day = day + self.place_order()
+                yield self.env.timeout(1)
+                day += 1
+
+    def skip_quiet_days(self, start, end):
+        """Records days [start, end), with no arrival and no order, in one block."""
+        demand = self.demand_array[start:end]
+        inventory_levels = inventory_path(self.inventory, demand)
+        fulfilled = np.concatenate(([self.inventory], inventory_levels[:-1])) - inventory_levels
+        lost_sales = demand - fulfilled
+        held = held_units(self.cumulative_demand, self.cumulative_demand_sums, start, end, self.inventory)
+
+        self.total_holding_cost += held * HOLDING_COST_PER_UNIT
+        self.total_stockout_cost += int(lost_sales.sum()) * STOCKOUT_COST_PER_UNIT
+        self.inventory = int(inventory_levels[-1])
+
+        n_days = end - start
+        self.daily_data.extend(map(list, zip(
+            range(start, end), demand.tolist(), inventory_levels.tolist(), lost_sales.tolist(),
+            (inventory_levels * HOLDING_COST_PER_UNIT).tolist(), (lost_sales * STOCKOUT_COST_PER_UNIT).tolist(),
+            [self.total_ordering_cost] * n_days
+        )))
+
+def draw_delays(n, rng):
+    """Draws n order delays, distributed like place_order's, from the np.random.Generator rng."""
+    delays = np.full(n, LEAD_TIME + DELIVERY_TIME, dtype=np.int64)
+    disrupted = rng.random(n) < DISRUPTION_PROBABILITY
+    delays[disrupted] += rng.integers(DISRUPTION_EXTRA_DELAY[0], DISRUPTION_EXTRA_DELAY[1] + 1, size=int(disrupted.sum()))
+    return delays
+
+def main(csv_filename=CSV_FILENAME, sim_days=SIMULATION_DAYS):
+    """Runs the simulation and saves its daily data to csv_filename."""
+    env = simpy.Environment()
+    supply_chain = SupplyChain(env)
+    env.run(until=sim_days)
+
+    with open(csv_filename, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(DAILY_DATA_COLUMNS)
+        writer.writerows(supply_chain.daily_data)
+    print(f"Simulation complete. Data saved to '{csv_filename}'.")
+    return supply_chain
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
+import argparse
+from collections import Counter
 import simpy
 import numpy as np
-import pandas as pd
 from data_generator import DataGenerator
+from event_log import EventLog, VERBOSITY_LEVELS
+from instrumentation import Profiler, NULL_PROFILER, PROFILE_TOP_N, profile_call
 from Store import Store
 from supplier import Supplier
 from fixed_order_supply_chain import FixedOrderSupplyChain
-from optimized_ml_supply_chain import OptimizedMLSupplyChain
+from result_cache import ResultCache, CACHE_DIR, MAX_CACHE_BYTES, capture_random_state, run_arrays, scenario_key
+from result_sink import ColumnarSink, FIXED_ORDER_COLUMNS
 
 # --------------------------
 # Data Generation Parameters
@@ -21,59 +25,189 @@ SEED = 1
 # --------------------------
 SIMULATION_DAYS = 100
 CSV_FILENAME = "simulation_results.csv"
+LEAD_TIME_SEED = SEED  # Seeds the global np.random stream (fixed-policy lead times, ML model) and the suppliers
 
-def run_simulation(supply_chain_class, test_name, demand_data, csv_filename):
-    """Runs the supply chain simulation and logs results to a CSV file."""
-    env = simpy.Environment()
-    store = Store()
-    suppliers = [
-        Supplier("Cheap", reliability=0.6, cost_multiplier=0.8, delivery_time_range=(7, 10), per_unit_price=15, shipping_cost=100),
-        Supplier("Normal", reliability=0.85, cost_multiplier=1.0, delivery_time_range=(4, 7), per_unit_price=20, shipping_cost=80),
-        Supplier("Premium", reliability=0.95, cost_multiplier=1.3, delivery_time_range=(2, 5), per_unit_price=25, shipping_cost=50),
-        Supplier("Expedited", reliability=1.0, cost_multiplier=2.0, delivery_time_range=(1, 2), per_unit_price=40, shipping_cost=200)
+# OptimizedMLSupplyChain (and with it scikit-learn) is only imported when first accessed
+def __getattr__(name):
+    if name == "OptimizedMLSupplyChain":
+        from optimized_ml_supply_chain import OptimizedMLSupplyChain
+        return OptimizedMLSupplyChain
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def build_suppliers(seed=None):
+    """
+    Returns the standard Cheap/Normal/Premium/Expedited supplier set. With a seed,
+    each supplier gets its own independent lead-time stream spawned from it. A list
+    of four seeds (e.g. children already spawned) seeds the suppliers directly.
+    """
+    if seed is None:
+        seeds = [None] * 4
+    elif isinstance(seed, (list, tuple)):
+        seeds = list(seed)
+    else:
+        seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        seeds = seed_seq.spawn(4)
+    return [
+        Supplier("Cheap", reliability=0.6, cost_multiplier=0.8, delivery_time_range=(7, 10), per_unit_price=15, shipping_cost=100, seed=seeds[0]),
+        Supplier("Normal", reliability=0.85, cost_multiplier=1.0, delivery_time_range=(4, 7), per_unit_price=20, shipping_cost=80, seed=seeds[1]),
+        Supplier("Premium", reliability=0.95, cost_multiplier=1.3, delivery_time_range=(2, 5), per_unit_price=25, shipping_cost=50, seed=seeds[2]),
+        Supplier("Expedited", reliability=1.0, cost_multiplier=2.0, delivery_time_range=(1, 2), per_unit_price=40, shipping_cost=200, seed=seeds[3])
     ]
-    
-    if "Fixed" in test_name:
-        fixed_supplier = next(s for s in suppliers if s.name == "Normal")
-        supply_chain = supply_chain_class(env, store, fixed_supplier, demand_data, csv_filename)
+
+def simulate(supply_chain_class, demand_data, csv_filename=None, sim_days=SIMULATION_DAYS, store=None, suppliers=None,
+             profiler=None, event_log=None, supplier=None, **policy_kwargs):
+    """
+    Runs a single replication of a policy and returns its store and supply chain.
+    Extra keyword arguments (e.g. event_driven=True) are passed to the policy.
+    The fixed policy orders from supplier, by default the one named "Normal".
+
+    With a profiler, the policy's phases are timed and the whole SimPy run is the
+    "simulate" phase, whose self time is SimPy scheduling plus any untimed code.
+    Daily events go to event_log (an event_log.EventLog) if one is given.
+    """
+    if profiler is not None:
+        policy_kwargs["profiler"] = profiler
+    if event_log is not None:
+        policy_kwargs["event_log"] = event_log
+    profiler = profiler if profiler is not None else NULL_PROFILER
+    env = simpy.Environment()
+    store = store if store is not None else Store()
+    suppliers = suppliers if suppliers is not None else build_suppliers()
+
+    if issubclass(supply_chain_class, FixedOrderSupplyChain):
+        if supplier is None:
+            supplier = next(s for s in suppliers if s.name == "Normal")
+        supply_chain = supply_chain_class(env, store, supplier, demand_data, csv_filename, **policy_kwargs)
     else:
-        supply_chain = supply_chain_class(env, store, suppliers, demand_data, csv_filename)
-    
-    # Run the simulation
-    env.run(until=SIMULATION_DAYS)
-    
-    print(f"\n=== Test Case: {test_name} ===")
-    print(f"Final Inventory: {store.inventory}")
-    print(f"Stockouts: {store.stockouts}")
-    print(f"Orders Placed: {len(store.order_history)}")
-    print(f"Supplier Selection: {store.supplier_history}")
-    
-    df = pd.read_csv(csv_filename)
-    df.to_csv(csv_filename, index=False)
-    print(f"Simulation results saved to {csv_filename}")
-    
+        supply_chain = supply_chain_class(env, store, suppliers, demand_data, **policy_kwargs)
+
+    with profiler.phase("simulate"):
+        env.run(until=sim_days)
+    # Streams of unknown length (or runs cut short by sim_days) never reach the policy's last day
+    if getattr(supply_chain, "sink", None) is not None:
+        supply_chain.sink.close()
+    return store, supply_chain
+
+def summarize(store, supply_chain):
+    """Collects the end-of-run financial totals of a replication into a dict."""
     total_revenue = supply_chain.total_revenue
     total_costs = supply_chain.total_supplier_cost + supply_chain.total_holding_costs + supply_chain.total_stockout_costs
     profit = total_revenue - total_costs
     roi = (profit / total_costs) * 100 if total_costs > 0 else 0
+    return {
+        "total_revenue": total_revenue,
+        "total_costs": total_costs,
+        "profit": profit,
+        "roi": roi,
+        "stockouts": store.stockouts,
+        "orders_placed": store.orders_received,
+        "final_inventory": store.inventory,
+    }
+
+def run_simulation(supply_chain_class, test_name, demand_data, csv_filename, profiler=None, event_log=None,
+                   suppliers=None, cache=None, data_generator=None):
+    """
+    Runs the supply chain simulation and logs results to a CSV file.
+
+    With a cache (a result_cache.ResultCache), a run whose inputs all match a cached
+    run is not simulated again. Its totals come from the cache and the CSV is written
+    from the cached per-day rows, and the global np.random stream and the suppliers'
+    lead-time streams are moved to where the run left them, so later runs draw the
+    same values with or without the cache. Only seeded runs can match: pass seeded
+    suppliers and seed np.random first.
+    """
+    suppliers = suppliers if suppliers is not None else build_suppliers()
+    is_fixed_order = issubclass(supply_chain_class, FixedOrderSupplyChain)
+    cached = None
+    if cache is not None:
+        key = scenario_key(supply_chain_class, demand_data, suppliers, SIMULATION_DAYS, data_generator=data_generator)
+        cached = cache.get(key)
+    cache_hit = cached is not None
+
+    if not cache_hit:
+        policy_kwargs = {}
+        if cache is not None and is_fixed_order:
+            # Keep the daily rows in memory for the cache entry; the CSV is written from it below
+            policy_kwargs["sink"] = ColumnarSink(FIXED_ORDER_COLUMNS, len(demand_data))
+        store, supply_chain = simulate(supply_chain_class, demand_data, csv_filename, suppliers=suppliers,
+                                       profiler=profiler, event_log=event_log, **policy_kwargs)
+        results = {"totals": summarize(store, supply_chain),
+                   "supplier_selection": dict(Counter(store.supplier_history))}
+        if cache is not None:
+            cached = cache.put(key, results, run_arrays(store, supply_chain), capture_random_state(suppliers))
+    else:
+        results = cached.summary
+        cached.restore_random_state(suppliers)
+    if cached is not None and is_fixed_order and csv_filename is not None:
+        cached.write_csv(csv_filename, FIXED_ORDER_COLUMNS)
+    summary = results["totals"]
+
+    print(f"\n=== Test Case: {test_name} ===")
+    if cache is not None:
+        print(f"Result cache: {'hit' if cache_hit else 'miss'}")
+    print(f"Final Inventory: {summary['final_inventory']}")
+    print(f"Stockouts: {summary['stockouts']}")
+    print(f"Orders Placed: {summary['orders_placed']}")
+    print(f"Supplier Selection: {results['supplier_selection']}")
+    
+    if is_fixed_order and csv_filename is not None:
+        print(f"Simulation results saved to {csv_filename}")
     
     print("\n=== FINAL SIMULATION RESULTS ===")
-    print(f"Total Revenue: ${total_revenue:.2f}")
-    print(f"Total Costs: ${total_costs:.2f}")
-    print(f"Profit: ${profit:.2f}")
-    print(f"Final ROI: {roi:.2f}%")
+    print(f"Total Revenue: ${summary['total_revenue']:.2f}")
+    print(f"Total Costs: ${summary['total_costs']:.2f}")
+    print(f"Profit: ${summary['profit']:.2f}")
+    print(f"Final ROI: {summary['roi']:.2f}%")
+    return summary
 
-if __name__ == "__main__":
+def parse_args():
+    parser = argparse.ArgumentParser(description="Runs the supply chain simulation.")
+    parser.add_argument("--log-level", choices=VERBOSITY_LEVELS, default="quiet",
+                        help="print simulation events up to this level (orders or daily)")
+    parser.add_argument("--profile-summary", metavar="PATH",
+                        help="time each phase of the run and write a JSON summary to PATH")
+    parser.add_argument("--track-allocations", action="store_true",
+                        help="also record bytes allocated per phase (with --profile-summary)")
+    parser.add_argument("--cprofile", metavar="PATH", help="run under cProfile and write the top hot spots to PATH")
+    parser.add_argument("--cprofile-top", type=int, default=PROFILE_TOP_N, metavar="N", help="hot spots written by --cprofile")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="directory of the on-disk result cache")
+    parser.add_argument("--cache-max-mb", type=float, default=MAX_CACHE_BYTES / 2**20,
+                        help="size of the result cache before least recently used entries are evicted")
+    parser.add_argument("--no-cache", action="store_true", help="always simulate, and do not cache the result")
+    return parser.parse_args()
+
+def main(args):
+    profiler = Profiler(track_allocations=args.track_allocations).start() if args.profile_summary else None
+    event_log = EventLog(args.log_level, echo=True)
     data_generator = DataGenerator(sim_days=SIMULATION_DAYS, seasonality_factor=SEASONALITY_FACTOR,
                                    trend_factor=TREND_FACTOR, volatility=VOLATILITY, 
-                                   shock_prob=SHOCK_PROBABILITY, seed=SEED)
+                                   shock_prob=SHOCK_PROBABILITY, seed=SEED, profiler=profiler)
     shared_demand_data = data_generator.generate_demand_data()
+    # DataGenerator only seeds its own Generator; seed the lead-time streams too, so a
+    # fixed SEED gives the same run every time (which is also what lets the cache match)
+    np.random.seed(LEAD_TIME_SEED)
+    suppliers = build_suppliers(LEAD_TIME_SEED)
+
+    cache = None if args.no_cache else ResultCache(args.cache_dir, int(args.cache_max_mb * 2**20))
 
         
     print("\n=== Running Fixed Order Model ===")
-    run_simulation(FixedOrderSupplyChain, "Fixed_Model", shared_demand_data, CSV_FILENAME)
+    run_simulation(FixedOrderSupplyChain, "Fixed_Model", shared_demand_data, CSV_FILENAME, profiler=profiler,
+                   event_log=event_log, suppliers=suppliers, cache=cache, data_generator=data_generator)
     """
     # Do Not Uncomment
     print("\n=== Running Optimized ML Model ===")
+    from optimized_ml_supply_chain import OptimizedMLSupplyChain
     run_simulation(OptimizedMLSupplyChain, "Optimized_Model_ML", shared_demand_data, "optimized_ml_results.csv")"""
+
+    if profiler is not None:
+        profiler.stop().write_summary(args.profile_summary)
+        print(f"Phase timings saved to {args.profile_summary}")
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.cprofile:
+        profile_call(main, args, path=args.cprofile, top_n=args.cprofile_top)
+    else:
+        main(args)
     
\ No newline at end of file
@@ -0,0 +1,363 @@
+"""
+Long-lived asyncio service for what-if simulation requests.
+
+Scenarios arrive as JSON lines on stdin or on a local socket, for example:
+
+    {"id": "a", "policy": "fixed", "seed": 7, "reorder_point": 60, "order_quantity": 120, "supplier": "Premium"}
+    {"id": "c", "policy": "fixed", "seed": 7, "supplier": "Cheap", "lead_time_model": "supplier"}
+    {"id": "b", "policy": "ml", "seed": 7, "sim_days": 365, "suppliers": ["Cheap", "Normal", "Expedited"]}
+    {"op": "stats"}
+
+Each scenario runs in a warm process pool whose workers already have NumPy and
+SimPy imported. Identical scenarios share one run while it is in flight, and
+finished results are kept in an LRU cache keyed by the scenario hash. One JSON line
+is written back per request as soon as its result is ready, so responses can arrive
+out of order; match them by "id".
+
+    python simulation_service.py                      # JSON lines on stdin/stdout
+    python simulation_service.py --socket /tmp/sim.sock
+    python simulation_service.py --port 8765
+"""
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from data_generator import DataGenerator
+from fixed_order_supply_chain import FixedOrderSupplyChain
+from replication_engine import DEFAULT_GENERATOR_PARAMS
+from result_cache import json_default
+from simulation_runner import build_suppliers, simulate, summarize, SIMULATION_DAYS
+from Store import CompactStore
+
+# --------------------------
+# Service Settings
+# --------------------------
+DEFAULT_CACHE_SIZE = 1024  # Completed scenario results kept in the LRU cache
+MAX_SIM_DAYS = 1_000_000  # Longest horizon a request may ask for
+POLICIES = ("fixed", "ml")
+SUPPLIER_NAMES = ("Cheap", "Normal", "Premium", "Expedited")  # As built by simulation_runner.build_suppliers
+# Request keys that are not scenario inputs, so they do not affect the scenario hash
+REQUEST_ONLY_KEYS = {"id", "op"}
+SCENARIO_FIELDS = {"policy", "seed", "sim_days", "generator"}
+# Policy keyword arguments a scenario may set, plus the supplier choice: the single
+# supplier the fixed policy orders from, or the subset the ML policy chooses among
+POLICY_OPTIONS = {
+    "fixed": {"reorder_point", "order_quantity", "event_driven"},
+    "ml": {"lookback", "refit_every", "demand_bucket", "demand_feature", "safety_std_factor", "event_driven"},
+}
+SUPPLIER_FIELDS = {"fixed": "supplier", "ml": "suppliers"}
+DEFAULT_SUPPLIERS = {"supplier": "Normal", "suppliers": list(SUPPLIER_NAMES)}
+EMERGENCY_SUPPLIER = "Expedited"  # The ML policy's emergency supplier, required in its supplier list
+# Where the fixed policy's lead times come from: its own np.random.randint(4, 7) draws
+# (the default, as in replication_engine) or the chosen supplier's delivery-time model
+LEAD_TIME_FIELD = "lead_time_model"
+LEAD_TIME_MODELS = ("policy", "supplier")
+GENERATOR_FIELDS = set(DEFAULT_GENERATOR_PARAMS)  # DataGenerator parameters a scenario may override
+
+
+def policy_class(policy):
+    if policy == "ml":
+        from optimized_ml_supply_chain import OptimizedMLSupplyChain
+        return OptimizedMLSupplyChain
+    return FixedOrderSupplyChain
+
+
+def policy_defaults(policy):
+    """Default values of the policy keyword arguments a scenario may set."""
+    parameters = inspect.signature(policy_class(policy).__init__).parameters
+    return {name: parameters[name].default for name in POLICY_OPTIONS[policy]}
+
+
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# Accepted values of each policy option, as (check, description) pairs
+POLICY_OPTION_CHECKS = {
+    "reorder_point": (lambda value: is_integer(value) and value >= 0, "a non-negative integer"),
+    "order_quantity": (lambda value: is_integer(value) and value > 0, "a positive integer"),
+    "event_driven": (lambda value: isinstance(value, bool), "true or false"),
+    "lookback": (lambda value: is_integer(value) and value > 0, "a positive integer"),
+    "refit_every": (lambda value: is_integer(value) and value > 0, "a positive integer"),
+    "demand_bucket": (lambda value: value is None or (is_number(value) and value > 0), "a positive number or null"),
+    "demand_feature": (lambda value: value in ("mean", "ewma"), "\"mean\" or \"ewma\""),
+    "safety_std_factor": (lambda value: is_number(value) and value >= 0, "a non-negative number"),
+}
+
+
+def normalize_scenario(request):
+    """
+    Returns the scenario inputs of a request with every default filled in, so that
+    requests for the same run hash the same, or raises ValueError.
+    """
+    scenario = {key: value for key, value in request.items() if key not in REQUEST_ONLY_KEYS}
+    policy = scenario.setdefault("policy", "fixed")
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; expected one of {', '.join(POLICIES)}")
+    scenario.setdefault("seed", 0)
+    if not is_integer(scenario["seed"]) or scenario["seed"] < 0:
+        raise ValueError("seed must be a non-negative integer")
+    scenario.setdefault("sim_days", SIMULATION_DAYS)
+    if not is_integer(scenario["sim_days"]) or not 0 < scenario["sim_days"] <= MAX_SIM_DAYS:
+        raise ValueError(f"sim_days must be an integer between 1 and {MAX_SIM_DAYS}")
+    generator = scenario.get("generator", {})
+    if not isinstance(generator, dict):
+        raise ValueError("generator must be an object of DataGenerator parameters")
+    unknown = set(generator) - GENERATOR_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown generator fields: {sorted(unknown)}; expected some of {sorted(GENERATOR_FIELDS)}")
+    if not all(is_number(value) for value in generator.values()):
+        raise ValueError("generator parameters must be numbers")
+    scenario["generator"] = dict(DEFAULT_GENERATOR_PARAMS, **generator)
+    fields = SCENARIO_FIELDS | POLICY_OPTIONS[policy] | {SUPPLIER_FIELDS[policy]}
+    if policy == "fixed":
+        fields.add(LEAD_TIME_FIELD)
+    unknown = set(scenario) - fields
+    if unknown:
+        raise ValueError(f"Unknown scenario fields for policy {policy!r}: {sorted(unknown)}")
+    scenario = dict(policy_defaults(policy), **scenario)
+    for name in POLICY_OPTIONS[policy]:
+        check, description = POLICY_OPTION_CHECKS[name]
+        if not check(scenario[name]):
+            raise ValueError(f"{name} must be {description}")
+    if policy == "ml" and scenario["event_driven"] and scenario["demand_feature"] != "mean":
+        raise ValueError("event_driven runs require demand_feature \"mean\"")
+    supplier_field = SUPPLIER_FIELDS[policy]
+    scenario.setdefault(supplier_field, DEFAULT_SUPPLIERS[supplier_field])
+    if policy == "fixed":
+        if not isinstance(scenario["supplier"], str) or scenario["supplier"] not in SUPPLIER_NAMES:
+            raise ValueError(f"Unknown supplier {scenario['supplier']!r}")
+        scenario.setdefault(LEAD_TIME_FIELD, LEAD_TIME_MODELS[0])
+        if scenario[LEAD_TIME_FIELD] not in LEAD_TIME_MODELS:
+            raise ValueError(f"{LEAD_TIME_FIELD} must be one of {', '.join(LEAD_TIME_MODELS)}")
+    if policy == "ml":
+        suppliers = scenario["suppliers"]
+        if not isinstance(suppliers, list) or not all(isinstance(name, str) for name in suppliers):
+            raise ValueError("suppliers must be a list of supplier names")
+        names = set(suppliers)
+        if not names <= set(SUPPLIER_NAMES):
+            raise ValueError(f"suppliers must be drawn from {', '.join(SUPPLIER_NAMES)}")
+        if EMERGENCY_SUPPLIER not in names or len(names) < 2:
+            raise ValueError(f"suppliers must include {EMERGENCY_SUPPLIER!r} and at least one other supplier")
+        scenario["suppliers"] = sorted(names, key=SUPPLIER_NAMES.index)
+    return scenario
+
+
+def scenario_key(scenario):
+    """SHA-256 of the canonical JSON form of a normalized scenario."""
+    return hashlib.sha256(json.dumps(scenario, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def run_scenario(scenario):
+    """
+    Runs one normalized scenario and returns its simulation_runner.summarize dict.
+    Seeds are used as in replication_engine.run_replication, so a scenario with the
+    default suppliers and lead-time model reproduces that replication exactly. The
+    fixed policy prices its orders with the chosen supplier and keeps its own
+    randint(4, 7) lead times unless lead_time_model is "supplier".
+    """
+    seed_seq = np.random.SeedSequence(scenario["seed"])
+    demand_seed, lead_time_seed = seed_seq.spawn(2)
+    sim_days = scenario["sim_days"]
+    demand_data = DataGenerator(sim_days=sim_days, seed=demand_seed, **scenario["generator"]).generate_demand_data()
+    suppliers = build_suppliers(lead_time_seed)
+    options = {key: scenario[key] for key in POLICY_OPTIONS[scenario["policy"]]}
+    if scenario["policy"] == "fixed":
+        supplier = next(s for s in suppliers if s.name == scenario["supplier"])
+        options["supplier"] = supplier
+        if scenario[LEAD_TIME_FIELD] == "supplier":
+            options["lead_times"] = supplier.sample_delivery_times(sim_days)
+    else:
+        suppliers = [s for s in suppliers if s.name in scenario["suppliers"]]
+
+    # The ML model and the fixed policy's own lead times draw from the global stream
+    np.random.seed(lead_time_seed.generate_state(1)[0])
+    store, supply_chain = simulate(policy_class(scenario["policy"]), demand_data, sim_days=sim_days,
+                                   store=CompactStore(sim_days, keep_history=False), suppliers=suppliers, **options)
+    return summarize(store, supply_chain)
+
+
+def _warm_worker(preload_ml):
+    # Unpickling run_scenario already imports this module, and with it NumPy, SimPy and the fixed policy
+    if preload_ml:
+        import optimized_ml_supply_chain
+        optimized_ml_supply_chain.build_delay_model()
+
+
+def _ping():
+    return os.getpid()
+
+
+class SimulationService:
+    """
+    Runs scenario requests in a warm process pool, with in-flight deduplication and an
+    LRU cache of finished results.
+
+    Parameters:
+        max_workers (int, optional): Worker processes; defaults to the CPU count.
+        cache_size (int): Finished results kept, least recently used evicted first.
+        preload_ml (bool): Also import scikit-learn in every worker at startup.
+    """
+
+    def __init__(self, max_workers=None, cache_size=DEFAULT_CACHE_SIZE, preload_ml=False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.preload_ml = preload_ml
+        self.cache = OrderedDict()
+        self.in_flight = {}
+        self.pool = None
+        self.stats = {"requests": 0, "runs": 0, "cache_hits": 0, "deduplicated": 0, "errors": 0}
+
+    async def start(self):
+        """Starts the pool and waits until every worker is up."""
+        self.pool = ProcessPoolExecutor(self.max_workers, initializer=_warm_worker, initargs=(self.preload_ml,))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.pool, _ping) for _ in range(self.max_workers)])
+        return self
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def submit(self, request):
+        """Handles one request dict and returns its response dict."""
+        request_id = request.get("id")
+        if request.get("op") == "stats":
+            return {"id": request_id, "status": "ok", "stats": dict(self.stats, cached=len(self.cache))}
+        self.stats["requests"] += 1
+        started = time.perf_counter()
+        try:
+            scenario = normalize_scenario(request)
+            key = scenario_key(scenario)
+            result, source = await self._result(key, scenario)
+        except Exception as exc:
+            self.stats["errors"] += 1
+            return {"id": request_id, "status": "error", "error": f"{type(exc).__name__}: {exc}"}
+        return {"id": request_id, "status": "ok", "key": key, "source": source, "result": result,
+                "seconds": time.perf_counter() - started}
+
+    async def _result(self, key, scenario):
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return self.cache[key], "cache"
+        if key in self.in_flight:
+            self.stats["deduplicated"] += 1
+            return await asyncio.shield(self.in_flight[key]), "shared"
+
+        future = asyncio.get_running_loop().run_in_executor(self.pool, run_scenario, scenario)
+        self.in_flight[key] = future
+        self.stats["runs"] += 1
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            del self.in_flight[key]
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result, "run"
+
+    async def handle_line(self, line, send):
+        """Parses one JSON line, runs it and passes the response to the coroutine send."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as exc:
+            self.stats["errors"] += 1
+            await send({"id": None, "status": "error", "error": f"Invalid request: {exc}"})
+            return
+        await send(await self.submit(request))
+
+    async def serve_lines(self, read_line, write):
+        """Reads request lines until EOF and writes responses as they complete."""
+        lock = asyncio.Lock()
+
+        async def send(response):
+            async with lock:
+                await write(json.dumps(response, default=json_default) + "\n")
+
+        tasks = set()
+        while True:
+            line = await read_line()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(self.handle_line(line, send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def serve_stdin(self):
+        async def read_line():
+            return await asyncio.to_thread(sys.stdin.readline)
+
+        async def write(text):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        await self.serve_lines(read_line, write)
+
+    async def serve_socket(self, path=None, host="127.0.0.1", port=None):
+        """Serves JSON lines on a Unix socket at path, or on a local TCP port."""
+        async def handle_connection(reader, writer):
+            async def read_line():
+                return (await reader.readline()).decode()
+
+            async def write(text):
+                writer.write(text.encode())
+                await writer.drain()
+
+            try:
+                await self.serve_lines(read_line, write)
+            finally:
+                writer.close()
+
+        if path is not None:
+            server = await asyncio.start_unix_server(handle_connection, path=path)
+        else:
+            server = await asyncio.start_server(handle_connection, host=host, port=port)
+        async with server:
+            await server.serve_forever()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serves what-if simulation requests as JSON lines.")
+    parser.add_argument("--socket", metavar="PATH", help="listen on this Unix socket instead of stdin")
+    parser.add_argument("--port", type=int, help="listen on this local TCP port instead of stdin")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    parser.add_argument("--preload-ml", action="store_true", help="import scikit-learn in workers at startup")
+    return parser.parse_args()
+
+
+async def main(args):
+    async with SimulationService(args.workers, args.cache_size, args.preload_ml) as service:
+        if args.socket or args.port:
+            await service.serve_socket(args.socket, args.host, args.port)
+        else:
+            await service.serve_stdin()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
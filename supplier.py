@@ -1,36 +1,72 @@
 import numpy as np
 
+DELIVERY_TIME_BLOCK = 64  # Delivery times drawn per refill of the buffer behind get_delivery_time
+
 class Supplier:
     """
     Represents a supplier in the supply chain, defining their reliability, delivery time,
-    cost structure, and pricing model. The supplier determines delivery time based on 
-    reliability and calculates the total cost of an order, including per-unit price, 
+    cost structure, and pricing model. The supplier determines delivery time based on
+    reliability and calculates the total cost of an order, including per-unit price,
     cost multiplier, bulk discounts, and shipping costs.
+
+    Each supplier draws delivery times from its own np.random.Generator (seeded by
+    seed), so its lead-time stream does not depend on what other suppliers or
+    policies draw, or in which order. Every delivery time uses one pair of uniform
+    draws, so sampling n then m delivery times gives the same values as sampling n + m.
     """
 
-    def __init__(self, name, reliability, cost_multiplier, delivery_time_range, per_unit_price, shipping_cost):
+    def __init__(self, name, reliability, cost_multiplier, delivery_time_range, per_unit_price, shipping_cost, seed=None):
         self.name = name
         self.reliability = reliability
         self.cost_multiplier = cost_multiplier
         self.delivery_time_range = delivery_time_range
-        self.per_unit_price = per_unit_price  
-        self.shipping_cost = shipping_cost  
+        self.per_unit_price = per_unit_price
+        self.shipping_cost = shipping_cost
+        self.rng = np.random.default_rng(seed)
+        self.delivery_times = np.empty(0, dtype=np.int64)
+        self.next_delivery_time = 0
+        self.cost_table = {}
 
 
     #Determines delivery time based on supplier reliability.
     def get_delivery_time(self):
-        
-        if np.random.rand() < self.reliability:
-            return np.random.randint(self.delivery_time_range[0], self.delivery_time_range[1] + 1)
-        else:
-            return np.random.randint(self.delivery_time_range[0] + 2, self.delivery_time_range[1] + 5)
-        
-        
-        
+        if self.next_delivery_time == len(self.delivery_times):
+            self.delivery_times = self.sample_delivery_times(DELIVERY_TIME_BLOCK)
+            self.next_delivery_time = 0
+        delivery_time = self.delivery_times[self.next_delivery_time]
+        self.next_delivery_time += 1
+        return int(delivery_time)
+
+
+    #Draws a vector of n delivery times from this supplier's generator in one call.
+    def sample_delivery_times(self, n):
+        draws = self.rng.random((n, 2))
+        return self.delivery_times_from_uniforms(draws[:, 0], draws[:, 1])
+
+
+    #Maps uniform draws to delivery times: on time within the range, late otherwise.
+    def delivery_times_from_uniforms(self, reliability_draws, range_draws):
+        low, high = self.delivery_time_range
+        on_time = np.asarray(reliability_draws) < self.reliability
+        first = np.where(on_time, low, low + 2)
+        span = np.where(on_time, high - low + 1, high - low + 3)
+        return first + np.floor(np.asarray(range_draws) * span).astype(np.int64)
+
+
     #Calculates total cost, including bulk discounts and shipping fees.
     def get_cost(self, order_quantity):
-        
-        base_cost = order_quantity * self.per_unit_price * self.cost_multiplier
-        discount = 0.9 if order_quantity >= 100 else 1  
-        total_cost = (base_cost * discount) + self.shipping_cost
+        total_cost = self.cost_table.get(order_quantity)
+        if total_cost is None:
+            base_cost = order_quantity * self.per_unit_price * self.cost_multiplier
+            discount = 0.9 if order_quantity >= 100 else 1
+            total_cost = (base_cost * discount) + self.shipping_cost
+            self.cost_table[order_quantity] = total_cost
         return total_cost
+
+
+    #Vectorized get_cost over an array of order quantities.
+    def get_costs(self, order_quantities):
+        order_quantities = np.asarray(order_quantities)
+        base_costs = order_quantities * self.per_unit_price * self.cost_multiplier
+        discounts = np.where(order_quantities >= 100, 0.9, 1)
+        return (base_costs * discounts) + self.shipping_cost
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+import simpy
+from checkpoint import Snapshot, run_fork
+from data_generator import DataGenerator
+from optimized_ml_supply_chain import OptimizedMLSupplyChain
+from simulation_runner import build_suppliers
+from Store import Store
+
+HORIZON = 200
+SNAPSHOT_DAY = 80
+
+
+def ml_snapshot(seed=0):
+    np.random.seed(seed)
+    demand = DataGenerator(sim_days=HORIZON, seed=seed).generate_demand_data()
+    env = simpy.Environment()
+    supply_chain = OptimizedMLSupplyChain(env, Store(), build_suppliers(seed), demand)
+    env.run(until=SNAPSHOT_DAY)
+    return Snapshot.capture(supply_chain)
+
+
+def test_ml_fork_applies_a_setting():
+    snapshot = ml_snapshot()
+    baseline = run_fork(snapshot)
+    assert run_fork(snapshot) == baseline
+    cautious = run_fork(snapshot, {"safety_std_factor": 3.0})
+    assert cautious != baseline
+
+
+def test_fork_rejects_keys_naming_methods():
+    with pytest.raises(ValueError, match="compute_reorder_threshold"):
+        run_fork(ml_snapshot(), {"compute_reorder_threshold": 60})
+
+
+@pytest.mark.parametrize("name", ["reorder_treshold", "reorder_threshold"])
+def test_fork_rejects_keys_that_are_not_settings(name):
+    # reorder_threshold is a fixed-policy setting; the ML policy has none by that name
+    with pytest.raises(ValueError, match=name):
+        run_fork(ml_snapshot(), {name: 60})
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from data_generator import DataGenerator
+from demand_stream import SyntheticDemandStream, SYNTHETIC_BLOCK_DAYS
+
+
+def streamed(chunk_days, n_days=2500, seed=3):
+    stream = SyntheticDemandStream(DataGenerator(seed=seed), n_days=n_days, chunk_days=chunk_days)
+    return np.concatenate(list(stream.blocks()))
+
+
+@pytest.mark.parametrize("chunk_days", [1, 50, 100, SYNTHETIC_BLOCK_DAYS, 3000])
+def test_synthetic_stream_does_not_depend_on_chunk_days(chunk_days):
+    assert np.array_equal(streamed(chunk_days), streamed(100))
+
+
+def test_synthetic_stream_does_not_depend_on_length():
+    assert np.array_equal(streamed(100, n_days=700), streamed(100)[:700])
+
+
+def test_synthetic_stream_replays_and_depends_on_seed():
+    stream = SyntheticDemandStream(DataGenerator(seed=None), n_days=300, chunk_days=64)
+    assert list(stream.days()) == list(stream.days())
+    assert not np.array_equal(streamed(100, seed=4), streamed(100))
+
+
+def test_ml_policy_records_a_summary_for_a_stream_of_unknown_length(tmp_path):
+    from demand_stream import CsvDemandStream, DEMAND_COLUMN
+    from event_log import EventLog, SUMMARY, RUN_SUMMARY
+    from optimized_ml_supply_chain import OptimizedMLSupplyChain
+    from simulation_runner import build_suppliers, simulate
+
+    path = tmp_path / "demand.csv"
+    path.write_text(DEMAND_COLUMN + "\n" + "\n".join(str(day % 7 + 5) for day in range(40)) + "\n")
+    event_log = EventLog(SUMMARY, capacity=10)
+    simulate(OptimizedMLSupplyChain, CsvDemandStream(path, chunk_days=16), sim_days=100,
+             suppliers=build_suppliers(0), event_log=event_log)
+    summaries = [event for event in event_log if event.kind == RUN_SUMMARY]
+    assert len(summaries) == 1
+    assert summaries[0].day == 39
+
+
+def test_ml_policy_rejects_a_training_window_too_small_to_train_on():
+    import simpy
+    from optimized_ml_supply_chain import OptimizedMLSupplyChain, MIN_TRAINING_SAMPLES
+    from simulation_runner import build_suppliers
+    from Store import Store
+
+    with pytest.raises(ValueError, match="max_training_samples"):
+        OptimizedMLSupplyChain(simpy.Environment(), Store(), build_suppliers(0), [10] * 20,
+                               max_training_samples=MIN_TRAINING_SAMPLES)
+    OptimizedMLSupplyChain(simpy.Environment(), Store(), build_suppliers(0), [10] * 20,
+                           max_training_samples=MIN_TRAINING_SAMPLES + 1)
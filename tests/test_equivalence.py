@@ -0,0 +1,206 @@
+"""
+Engines and run modes that promise identical results, checked against each other
+on a few seeds and horizons.
+"""
+import numpy as np
+import pytest
+import simpy
+import sim_code
+from checkpoint import Checkpointer, Snapshot
+from data_generator import DataGenerator
+from event_log import EventLog, RUN_SUMMARY, SUMMARY
+from fast_fixed_order import draw_lead_times, simulate_fixed_order_batch
+from fixed_order_supply_chain import FixedOrderSupplyChain
+from optimized_ml_supply_chain import OptimizedMLSupplyChain
+from replication_engine import run_replications
+from result_sink import ColumnarSink, FIXED_ORDER_COLUMNS
+from simulation_runner import build_suppliers, summarize
+from Store import Store, CompactStore
+
+SEEDS = [0, 1, 2]
+HORIZONS = [100, 400]
+FIXED_POLICY_VARIANTS = [{}, {"reorder_point": 70, "order_quantity": 60}]
+ML_POLICY_VARIANTS = [{}, {"safety_std_factor": 1.5, "refit_every": 5}, {"lookback": 9}]
+CHECKPOINT_DAYS = 50
+
+
+def make_demand(horizon, seed, n_series=1):
+    generator = DataGenerator(sim_days=horizon, seed=seed, trend_factor=0.02, volatility=5, shock_prob=0.15)
+    return generator.generate_demand_matrix(n_series)
+
+
+def normal_supplier(seed=None):
+    return next(s for s in build_suppliers(seed) if s.name == "Normal")
+
+
+def run_fixed_order(demand, lead_times, supplier, **policy_kwargs):
+    env = simpy.Environment()
+    store = Store()
+    supply_chain = FixedOrderSupplyChain(env, store, supplier, demand, None, lead_times=lead_times, **policy_kwargs)
+    env.run(until=len(demand))
+    return store, supply_chain
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("horizon", HORIZONS)
+@pytest.mark.parametrize("variant", FIXED_POLICY_VARIANTS)
+def test_batch_engine_matches_simpy_engine(seed, horizon, variant):
+    n_replications = 4
+    demand = make_demand(horizon, seed, n_replications)
+    lead_times = draw_lead_times(n_replications, horizon, np.random.default_rng(seed))
+    supplier = normal_supplier()
+    batch = simulate_fixed_order_batch(demand, lead_times, supplier, **variant)
+
+    for replication in range(n_replications):
+        store, supply_chain = run_fixed_order(demand[replication].tolist(), lead_times[replication], supplier,
+                                              **variant)
+        for field, value in summarize(store, supply_chain).items():
+            assert batch[field][replication] == value, (replication, field)
+        assert batch["total_supplier_cost"][replication] == supply_chain.total_supplier_cost
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("horizon", HORIZONS)
+@pytest.mark.parametrize("variant", FIXED_POLICY_VARIANTS)
+def test_fixed_order_event_driven_matches_day_by_day(seed, horizon, variant):
+    demand = make_demand(horizon, seed)[0].tolist()
+    lead_times = np.random.default_rng(seed).integers(0, 9, horizon)
+    runs = []
+    for event_driven in (False, True):
+        for store in (Store(), CompactStore(horizon)):
+            env = simpy.Environment()
+            sink = ColumnarSink(FIXED_ORDER_COLUMNS, horizon)
+            supply_chain = FixedOrderSupplyChain(env, store, normal_supplier(), demand, None, lead_times=lead_times,
+                                                 sink=sink, event_driven=event_driven, **variant)
+            env.run(until=horizon)
+            runs.append((summarize(store, supply_chain), sink.data(), list(store.demand_history)))
+
+    reference_totals, reference_rows, reference_demand = runs[0]
+    for totals, rows, demand_history in runs[1:]:
+        assert totals == reference_totals
+        assert demand_history == reference_demand
+        for column in reference_rows:
+            assert np.array_equal(rows[column], reference_rows[column]), column
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("horizon", HORIZONS)
+@pytest.mark.parametrize("variant", ML_POLICY_VARIANTS)
+def test_ml_event_driven_matches_day_by_day(seed, horizon, variant):
+    demand = make_demand(horizon, seed)[0].tolist()
+    runs = []
+    for event_driven in (False, True):
+        np.random.seed(seed)
+        env = simpy.Environment()
+        store = Store()
+        supply_chain = OptimizedMLSupplyChain(env, store, build_suppliers(seed), demand, event_driven=event_driven,
+                                              **variant)
+        env.run(until=horizon)
+        runs.append((summarize(store, supply_chain), supply_chain.missed_revenue, list(store.demand_history),
+                     list(store.supplier_history)))
+    assert runs[0] == runs[1]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("policy_class", [FixedOrderSupplyChain, OptimizedMLSupplyChain])
+def test_run_summary_is_logged_once_in_both_modes(policy_class, seed):
+    horizon = 400
+    demand = make_demand(horizon, seed)[0].tolist()
+    summaries = []
+    for event_driven in (False, True):
+        log = EventLog(SUMMARY, capacity=10)
+        env, supply_chain = start_policy(policy_class, demand, seed, event_driven, event_log=log)
+        env.run(until=horizon)
+        events = list(log)
+        assert [event.kind for event in events] == [RUN_SUMMARY]
+        assert events[0].fields["profit"] == pytest.approx(summarize(supply_chain.store, supply_chain)["profit"])
+        summaries.append(events[0].to_dict())
+    assert summaries[0] == summaries[1]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("horizon", HORIZONS)
+def test_sim_code_event_driven_matches_day_by_day(seed, horizon):
+    demand = make_demand(horizon, seed)[0].tolist()
+    delays = sim_code.draw_delays(horizon, np.random.default_rng(seed))
+    runs = []
+    for event_driven in (False, True):
+        env = simpy.Environment()
+        supply_chain = sim_code.SupplyChain(env, event_driven=event_driven, horizon=horizon, demand_data=demand,
+                                            delays=delays)
+        env.run(until=horizon)
+        runs.append((supply_chain.total_holding_cost, supply_chain.total_stockout_cost,
+                     supply_chain.total_ordering_cost, supply_chain.orders_received, supply_chain.daily_data))
+    assert runs[0] == runs[1]
+
+
+def start_policy(policy_class, demand, seed, event_driven, sink=None, event_log=None):
+    np.random.seed(seed)
+    env = simpy.Environment()
+    suppliers = build_suppliers(seed)
+    if policy_class is FixedOrderSupplyChain:
+        supply_chain = policy_class(env, Store(), suppliers[1], demand, None, sink=sink, event_driven=event_driven,
+                                    event_log=event_log)
+    else:
+        supply_chain = policy_class(env, Store(), suppliers, demand, event_driven=event_driven, event_log=event_log)
+    return env, supply_chain
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("horizon", HORIZONS)
+@pytest.mark.parametrize("event_driven", [False, True])
+@pytest.mark.parametrize("policy_class", [FixedOrderSupplyChain, OptimizedMLSupplyChain])
+@pytest.mark.parametrize("new_demand", [False, True])
+def test_resumed_run_matches_uninterrupted_run(tmp_path, new_demand, policy_class, event_driven, horizon, seed):
+    demand = make_demand(horizon, seed)[0].tolist()
+    path = tmp_path / "run.snapshot"
+    env, supply_chain = start_policy(policy_class, demand, seed, event_driven)
+    Checkpointer(env, supply_chain, path, every_days=CHECKPOINT_DAYS)
+    env.run(until=horizon // 2 + 7)
+    np.random.seed(seed + 100)  # Restoring must bring back the global stream as well
+    snapshot = Snapshot.load(path)
+    # Event-driven runs may already have skipped past the save time
+    assert CHECKPOINT_DAYS <= snapshot.next_day < horizon
+    if new_demand:
+        # A fork on other demand matches a run that saw the original demand up to the snapshot
+        other_demand = DataGenerator(sim_days=horizon, seed=seed + 50, trend_factor=0.3, volatility=15,
+                                     shock_prob=0.15).generate_demand_data()
+        resumed = snapshot.restore(demand_data=other_demand)
+        demand = demand[:snapshot.next_day] + other_demand[snapshot.next_day:]
+    else:
+        resumed = snapshot.restore()
+    resumed.env.run(until=horizon)
+
+    env, supply_chain = start_policy(policy_class, demand, seed, event_driven)
+    env.run(until=horizon)
+    reference = (summarize(supply_chain.store, supply_chain), list(supply_chain.store.demand_history))
+    assert (summarize(resumed.store, resumed), list(resumed.store.demand_history)) == reference
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_resumed_run_writes_the_remaining_sink_rows(seed):
+    horizon = 400
+    demand = make_demand(horizon, seed)[0].tolist()
+    sink = ColumnarSink(FIXED_ORDER_COLUMNS, horizon)
+    env, supply_chain = start_policy(FixedOrderSupplyChain, demand, seed, False, sink)
+    env.run(until=horizon)
+    reference = sink.data()
+
+    first_half = ColumnarSink(FIXED_ORDER_COLUMNS, horizon)
+    env, supply_chain = start_policy(FixedOrderSupplyChain, demand, seed, False, first_half)
+    env.run(until=horizon // 2)
+    second_half = ColumnarSink(FIXED_ORDER_COLUMNS, horizon)
+    resumed = Snapshot.capture(supply_chain).restore(sink=second_half)
+    resumed.env.run(until=horizon)
+    for column in reference:
+        rows = np.concatenate([first_half.data()[column], second_half.data()[column]])
+        assert np.array_equal(rows, reference[column]), column
+
+
+def test_resumed_replications_match_uninterrupted_replications(tmp_path):
+    path = tmp_path / "replications.checkpoint"
+    reference = run_replications(FixedOrderSupplyChain, 12, seed=4, max_workers=1)
+    run_replications(FixedOrderSupplyChain, 6, seed=4, max_workers=1, checkpoint_path=path)
+    partial = run_replications(FixedOrderSupplyChain, 12, seed=4, max_workers=1, checkpoint_path=path)
+    for field in reference.columns:
+        assert np.array_equal(partial.columns[field], reference.columns[field]), field
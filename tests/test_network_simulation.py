@@ -0,0 +1,36 @@
+import numpy as np
+from network_simulation import NetworkSimulation
+from Store import MAX_STORAGE_CAPACITY
+
+
+def test_shared_supplier_turns_down_requests_beyond_its_daily_capacity():
+    # Every node is below its reorder point on day 0 and asks Normal for 100 units
+    network = NetworkSimulation(n_stores=2, n_skus=3, supplier_capacity={"Normal": 250}, reorder_point=10_000,
+                                order_quantity=100, sim_days=1, seed=0)
+    network.step(0, np.zeros(network.n_nodes, dtype=np.int32))
+    stats = network.supplier_stats["Normal"]
+    assert (stats["orders"], stats["units"], stats["rejected"]) == (2, 200, 4)
+    assert network.orders_placed.sum() == 2
+    assert (network.arrival_day >= 0).sum() == 2
+
+    # Turned-down nodes ask again the next day, within a fresh day's capacity
+    network.step(1, np.zeros(network.n_nodes, dtype=np.int32))
+    assert network.supplier_stats["Normal"]["orders"] == 4
+    assert network.orders_placed.max() == 1
+
+
+def test_unlimited_suppliers_accept_every_request():
+    network = NetworkSimulation(n_stores=2, n_skus=3, reorder_point=10_000, order_quantity=100, sim_days=1, seed=0)
+    network.step(0, np.zeros(network.n_nodes, dtype=np.int32))
+    assert network.supplier_stats["Normal"]["orders"] == network.n_nodes
+    assert network.supplier_stats["Normal"]["rejected"] == 0
+
+
+def test_orders_due_before_today_are_received():
+    network = NetworkSimulation(n_stores=1, n_skus=2, reorder_point=0, order_quantity=100, sim_days=10, seed=0)
+    network.inventory[:] = 0
+    network.arrival_day[:] = [3, 5]
+    network.step(5, np.zeros(network.n_nodes, dtype=np.int32))
+    assert network.inventory.tolist() == [min(100, MAX_STORAGE_CAPACITY)] * 2
+    assert network.arrival_day.tolist() == [-1, -1]
+    assert network.orders_received.tolist() == [1, 1]
@@ -0,0 +1,35 @@
+from order_book import OrderBook
+
+
+def test_orders_come_out_in_arrival_order():
+    book = OrderBook()
+    for arrival_day, quantity in [(9, 10), (3, 20), (6, 30), (1, 40)]:
+        book.add(arrival_day, quantity, "Normal")
+    assert [order[0] for order in book] == [1, 3, 6, 9]
+    assert book.next_arrival_day() == 1
+    assert book.pop_due(5) == [(1, 40, "Normal"), (3, 20, "Normal")]
+    assert book.next_arrival_day() == 6
+    assert len(book) == 2
+
+
+def test_orders_due_on_the_same_day_keep_the_order_they_were_placed_in():
+    book = OrderBook()
+    book.add(4, 10, "Premium")
+    book.add(4, 20, "Cheap")
+    book.add(2, 5, "Expedited")
+    book.add(4, 30, "Normal")
+    assert book.pop_due(4) == [(2, 5, "Expedited"), (4, 10, "Premium"), (4, 20, "Cheap"), (4, 30, "Normal")]
+    assert len(book) == 0
+    assert book.next_arrival_day() is None
+
+
+def test_pop_due_leaves_later_orders_and_updates_aggregates():
+    book = OrderBook()
+    book.add(3, 10, "Normal")
+    book.add(3, 15, "Cheap")
+    book.add(8, 20, "Normal")
+    assert (book.on_order, book.on_order_from("Normal"), book.count_from("Normal")) == (45, 30, 2)
+    assert book.pop_due(2) == []
+    book.pop_due(3)
+    assert (book.on_order, book.on_order_from("Normal"), book.count_from("Normal")) == (20, 20, 1)
+    assert (book.on_order_from("Cheap"), book.count_from("Cheap"), book.count_from("Premium")) == (0, 0, 0)
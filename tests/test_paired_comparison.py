@@ -0,0 +1,30 @@
+import numpy as np
+from optimized_ml_supply_chain import OptimizedMLSupplyChain
+from paired_comparison import compare_policies
+from replication_engine import run_replication
+
+SEED = 7
+SIM_DAYS = 120
+REPLICATIONS = 3
+
+
+def compare(policies):
+    return compare_policies(policies, seed=SEED, sim_days=SIM_DAYS, min_replications=REPLICATIONS,
+                            max_replications=REPLICATIONS, max_workers=1)
+
+
+def test_ml_streams_do_not_depend_on_the_other_policies():
+    alone = compare(["ml"]).columns["ml"]
+    paired = compare(["fixed", "ml"]).columns["ml"]
+    assert alone.keys() == paired.keys()
+    for metric in alone:
+        assert np.array_equal(alone[metric], paired[metric]), metric
+
+
+def test_ml_matches_the_replication_engine_on_the_same_seed():
+    columns = compare(["fixed", "ml"]).columns["ml"]
+    children = np.random.SeedSequence(SEED).spawn(REPLICATIONS)
+    for r, child in enumerate(children):
+        summary = run_replication(OptimizedMLSupplyChain, child, sim_days=SIM_DAYS)
+        for metric, value in summary.items():
+            assert columns[metric][r] == value, metric
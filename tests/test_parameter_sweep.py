@@ -0,0 +1,45 @@
+"""
+The (s, Q, supplier) sweep scores candidates with the same lead-time model as the
+SimPy fixed-order policy unless the supplier itself is swept.
+"""
+import numpy as np
+import pytest
+import simpy
+from fast_fixed_order import DEFAULT_LEAD_TIME_RANGE
+from fixed_order_supply_chain import FixedOrderSupplyChain
+from parameter_sweep import CommonRandomNumbers, default_lead_time_model, evaluate_candidate, grid_search
+from Store import Store
+
+
+def test_policy_lead_times_follow_the_fixed_policy():
+    draws = CommonRandomNumbers(8, sim_days=100, seed=2)
+    low, high = DEFAULT_LEAD_TIME_RANGE
+    for lead_times in draws.lead_times.values():
+        assert lead_times is draws.lead_times["Normal"]
+    assert draws.lead_times["Normal"].min() >= low and draws.lead_times["Normal"].max() < high
+
+    candidate = (60, 120, "Normal")
+    outcome = evaluate_candidate(draws, candidate, draws.n_replications)
+    for replication in range(draws.n_replications):
+        env = simpy.Environment()
+        supply_chain = FixedOrderSupplyChain(env, Store(), draws.suppliers["Normal"], draws.demand[replication].tolist(),
+                                             None, lead_times=draws.lead_times["Normal"][replication],
+                                             reorder_point=60, order_quantity=120)
+        env.run(until=100)
+        assert outcome["stockouts"][replication] == supply_chain.store.stockouts
+
+
+def test_supplier_models_only_when_suppliers_are_swept():
+    assert default_lead_time_model(("Normal",)) == "policy"
+    assert default_lead_time_model(("Normal", "Normal")) == "policy"
+    assert default_lead_time_model(("Cheap", "Normal")) == "supplier"
+    draws = CommonRandomNumbers(8, sim_days=100, seed=2, lead_time_model="supplier")
+    assert not np.array_equal(draws.lead_times["Cheap"], draws.lead_times["Premium"])
+    with pytest.raises(ValueError):
+        CommonRandomNumbers(8, sim_days=100, seed=2, lead_time_model="random")
+
+
+def test_grid_search_ranks_single_supplier_sweeps():
+    result = grid_search([40, 60], [80, 120], n_replications=10, sim_days=100, seed=1, max_workers=1)
+    assert len(result) == 4
+    assert result.best["mean_profit"] == max(row["mean_profit"] for row in result)
@@ -0,0 +1,99 @@
+"""
+The on-disk result cache: hits must leave the random streams as a simulated run
+would, and every input of the scenario key must change it.
+"""
+import numpy as np
+import pytest
+import Store
+from data_generator import DataGenerator
+from fixed_order_supply_chain import FixedOrderSupplyChain
+from optimized_ml_supply_chain import OptimizedMLSupplyChain
+from result_cache import ResultCache, scenario_key
+from simulation_runner import build_suppliers, run_simulation, SIMULATION_DAYS
+
+SEED = 3
+
+
+def make_generator(seed=SEED, **params):
+    return DataGenerator(sim_days=SIMULATION_DAYS, seed=seed, **params)
+
+
+def run_sequence(demand, cache=None, first_class=FixedOrderSupplyChain, second_class=FixedOrderSupplyChain):
+    """Runs two policies one after the other on shared, seeded random streams and returns both summaries."""
+    np.random.seed(SEED)
+    suppliers = build_suppliers(SEED)
+    first = run_simulation(first_class, "A", demand, None, suppliers=suppliers, cache=cache)
+    second = run_simulation(second_class, "B", demand, None, suppliers=suppliers)
+    return first, second
+
+
+@pytest.mark.parametrize("first_class", [FixedOrderSupplyChain, OptimizedMLSupplyChain])
+@pytest.mark.parametrize("second_class", [FixedOrderSupplyChain, OptimizedMLSupplyChain])
+def test_cache_hit_leaves_later_runs_unchanged(tmp_path, first_class, second_class):
+    demand = make_generator().generate_demand_data()
+    cache = ResultCache(str(tmp_path))
+    reference = run_sequence(demand, None, first_class, second_class)
+    assert run_sequence(demand, cache, first_class, second_class) == reference
+    assert cache.misses == 1
+    assert run_sequence(demand, cache, first_class, second_class) == reference
+    assert cache.hits == 1
+
+
+def test_scenario_key_changes_with_every_input(monkeypatch):
+    generator = make_generator()
+    demand = generator.generate_demand_data()
+
+    def key(supply_chain_class=FixedOrderSupplyChain, demand_data=demand, suppliers=None, sim_days=SIMULATION_DAYS,
+            policy_kwargs=None, data_generator=generator, global_seed=SEED):
+        np.random.seed(global_seed)
+        suppliers = suppliers if suppliers is not None else build_suppliers(SEED)
+        return scenario_key(supply_chain_class, demand_data, suppliers, sim_days, policy_kwargs, data_generator)
+
+    def advanced_suppliers():
+        suppliers = build_suppliers(SEED)
+        suppliers[1].get_delivery_time()
+        return suppliers
+
+    def repriced_suppliers():
+        suppliers = build_suppliers(SEED)
+        suppliers[0].per_unit_price += 1
+        return suppliers
+
+    reference = key()
+    assert key() == reference
+    changed = {
+        "policy": key(supply_chain_class=OptimizedMLSupplyChain),
+        "demand": key(demand_data=demand[:-1] + [demand[-1] + 1]),
+        "supplier terms": key(suppliers=repriced_suppliers()),
+        "supplier stream": key(suppliers=advanced_suppliers()),
+        "supplier seed": key(suppliers=build_suppliers(SEED + 1)),
+        "global stream": key(global_seed=SEED + 1),
+        "horizon": key(sim_days=SIMULATION_DAYS + 1),
+        "policy kwargs": key(policy_kwargs={"reorder_point": 70}),
+        "generator parameters": key(data_generator=make_generator(volatility=6)),
+        "generator seed": key(data_generator=make_generator(seed=SEED + 1)),
+    }
+    monkeypatch.setattr(Store, "HOLDING_COST_PER_UNIT", Store.HOLDING_COST_PER_UNIT + 1)
+    changed["model constant"] = key()
+    for name, value in changed.items():
+        assert value != reference, name
+    assert len(set(changed.values())) == len(changed)
+
+
+@pytest.mark.parametrize("contents", [b"", b"PK\x03\x04 truncated", b"not a zip file at all"])
+def test_corrupt_entries_count_as_misses_and_are_removed(tmp_path, contents):
+    cache = ResultCache(tmp_path)
+    cache.put("good", {"profit": 1.0}, {"column": np.arange(3)})
+    with open(cache.path("bad"), "wb") as file:
+        file.write(contents)
+    assert cache.get("bad") is None
+    assert not (tmp_path / "bad.npz").exists()
+    assert cache.get("good").summary == {"profit": 1.0}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_without_a_summary_count_as_misses(tmp_path):
+    cache = ResultCache(tmp_path)
+    np.savez_compressed(cache.path("partial"), column=np.arange(3))
+    assert cache.get("partial") is None
+    assert cache.misses == 1
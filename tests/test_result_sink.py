@@ -0,0 +1,52 @@
+import csv
+import numpy as np
+import pytest
+from result_sink import ColumnarSink, FIXED_ORDER_COLUMNS, with_string_width
+
+LONG_NAME = "Transcontinental Freight Partners"
+
+
+def fixed_order_row(day, supplier_name="None"):
+    return (day, 100, 10, 10, 0, 0, supplier_name, 50.0, 0.0, 0.0, 500.0, 450.0, 900.0)
+
+
+@pytest.mark.parametrize("flush_every", [None, 4])
+def test_csv_keeps_supplier_names_longer_than_the_default_width(tmp_path, flush_every):
+    path = tmp_path / "results.csv"
+    sink = ColumnarSink(FIXED_ORDER_COLUMNS, 10, path=str(path), flush_every=flush_every)
+    for day in range(10):
+        sink.append(*fixed_order_row(day, LONG_NAME if day == 7 else "None"))
+    sink.close()
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert rows[7]["Supplier"] == LONG_NAME
+
+
+def test_extend_widens_string_columns():
+    sink = ColumnarSink(FIXED_ORDER_COLUMNS, 3)
+    columns = [np.array(values) for values in zip(*[fixed_order_row(day, LONG_NAME) for day in range(3)])]
+    sink.extend(*columns)
+    assert list(sink.data()["Supplier"]) == [LONG_NAME] * 3
+
+
+def test_npy_holds_the_rows_actually_written(tmp_path):
+    path = tmp_path / "results.npy"
+    columns = with_string_width(FIXED_ORDER_COLUMNS, "Supplier", len(LONG_NAME))
+    # A streaming sink's n_rows is only a first guess at the length
+    sink = ColumnarSink(columns, 4, path=str(path), flush_every=4)
+    for day in range(10):
+        sink.append(*fixed_order_row(day, LONG_NAME if day == 9 else "None"))
+    sink.close()
+    rows = np.load(path, mmap_mode="r")
+    assert rows.shape == (10,)
+    assert list(rows["Day"]) == list(range(10))
+    assert rows["Supplier"][9] == LONG_NAME
+    assert not (tmp_path / "results.npy.rows").exists()
+
+
+def test_npy_rejects_names_wider_than_rows_already_written(tmp_path):
+    sink = ColumnarSink(FIXED_ORDER_COLUMNS, 4, path=str(tmp_path / "results.npy"), flush_every=2)
+    sink.append(*fixed_order_row(0))
+    sink.append(*fixed_order_row(1))
+    with pytest.raises(ValueError, match="Supplier"):
+        sink.append(*fixed_order_row(2, LONG_NAME))
@@ -0,0 +1,51 @@
+import pytest
+from rolling_stats import RollingWindow
+
+SERIES = [7, 3, 9, 4, 12, 0, 5, 8, 6, 11, 2, 10, 1]
+
+
+def pushed(values, size=4):
+    window = RollingWindow(size)
+    for value in values:
+        window.push(value)
+    return window
+
+
+def state(window):
+    return (window.to_list(), len(window), window.full, window.oldest, window.mean, window.variance,
+            window.first, window.latest)
+
+
+def test_push_wraps_around_the_ring():
+    window = pushed(SERIES[:6])
+    assert window.to_list() == [9, 4, 12, 0]
+    assert window.oldest == 9
+    assert window.mean == pytest.approx(25 / 4)
+    assert window.depletion_rate == pytest.approx((0 - 7) / 4)
+
+
+def test_partial_window_reports_only_what_it_has_seen():
+    window = pushed(SERIES[:2])
+    assert not window.full
+    assert window.to_list() == [7, 3]
+    assert window.oldest == 7
+    assert window.mean == 5
+
+
+@pytest.mark.parametrize("split", [0, 1, 3, 5, 9, len(SERIES)])
+@pytest.mark.parametrize("block", [2, 4, 7])
+def test_extend_matches_pushing_one_value_at_a_time(split, block):
+    reference = pushed(SERIES)
+    window = pushed(SERIES[:split])
+    for start in range(split, len(SERIES), block):
+        window.extend(SERIES[start:start + block])
+    assert state(window) == state(reference)
+    assert window.ewma == pytest.approx(reference.ewma)
+    assert window.count == reference.count
+
+
+def test_extend_with_nothing_changes_nothing():
+    window = pushed(SERIES[:5])
+    before = state(window)
+    window.extend([])
+    assert state(window) == before
@@ -0,0 +1,56 @@
+"""
+Scenario normalization and runs of the what-if simulation service.
+"""
+import numpy as np
+import pytest
+from fixed_order_supply_chain import FixedOrderSupplyChain
+from optimized_ml_supply_chain import OptimizedMLSupplyChain
+from replication_engine import run_replication
+from simulation_service import normalize_scenario, run_scenario, scenario_key
+
+
+@pytest.mark.parametrize("policy, supply_chain_class", [("fixed", FixedOrderSupplyChain),
+                                                        ("ml", OptimizedMLSupplyChain)])
+@pytest.mark.parametrize("seed", [0, 7])
+def test_default_scenario_reproduces_replication(policy, supply_chain_class, seed):
+    result = run_scenario(normalize_scenario({"policy": policy, "seed": seed}))
+    assert result == run_replication(supply_chain_class, np.random.SeedSequence(seed))
+
+
+def test_defaults_hash_like_explicit_values():
+    explicit = {"policy": "fixed", "seed": 0, "supplier": "Normal", "lead_time_model": "policy",
+                "event_driven": False, "generator": {"volatility": 5}}
+    assert scenario_key(normalize_scenario({})) == scenario_key(normalize_scenario(explicit))
+    supplier_lead_times = normalize_scenario({"lead_time_model": "supplier"})
+    assert scenario_key(normalize_scenario({})) != scenario_key(supplier_lead_times)
+
+
+@pytest.mark.parametrize("request_fields", [
+    {"sim_days": "100"},
+    {"sim_days": 2.5},
+    {"sim_days": 0},
+    {"seed": "7"},
+    {"generator": {"volatilty": 3}},
+    {"generator": {"volatility": "high"}},
+    {"generator": [5]},
+    {"supplier": "Local"},
+    {"lead_time_model": "random"},
+    {"policy": "ml", "lead_time_model": "supplier"},
+    {"policy": "ml", "suppliers": ["Normal"]},
+    {"policy": "ml", "suppliers": ["Expedited"]},
+    {"policy": "ml", "suppliers": "Expedited"},
+    {"supplier": ["Normal"]},
+    {"reorder_point": "50"},
+    {"reorder_point": -1},
+    {"order_quantity": 12.5},
+    {"event_driven": 1},
+    {"policy": "ml", "lookback": 0},
+    {"policy": "ml", "refit_every": True},
+    {"policy": "ml", "demand_bucket": "5"},
+    {"policy": "ml", "demand_feature": "median"},
+    {"policy": "ml", "safety_std_factor": "1.5"},
+    {"policy": "ml", "event_driven": True, "demand_feature": "ewma"},
+])
+def test_invalid_scenarios_are_rejected(request_fields):
+    with pytest.raises(ValueError):
+        normalize_scenario(request_fields)
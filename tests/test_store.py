@@ -0,0 +1,30 @@
+"""
+CompactStore's process-wide supplier-code registry.
+"""
+import numpy as np
+import pytest
+import Store
+from Store import CompactStore
+
+
+@pytest.fixture
+def empty_registry(monkeypatch):
+    monkeypatch.setattr(Store, "SUPPLIER_CODES", {})
+    monkeypatch.setattr(Store, "SUPPLIER_NAMES", [])
+
+
+def test_more_than_256_suppliers_per_process(empty_registry):
+    names = [f"Supplier {index}" for index in range(300)]
+    store = CompactStore(len(names))
+    for name in names:
+        store.receive_order(1, name)
+    assert store.supplier_history == names
+
+
+def test_outgrowing_the_registry_fails_clearly(empty_registry, monkeypatch):
+    size = np.iinfo(Store.SUPPLIER_CODE_DTYPE).max + 1
+    monkeypatch.setattr(Store, "SUPPLIER_NAMES", [f"Supplier {index}" for index in range(size)])
+    store = CompactStore(1)
+    with pytest.raises(ValueError, match="distinct supplier names"):
+        store.receive_order(1, "One too many")
+    assert "One too many" not in Store.SUPPLIER_CODES